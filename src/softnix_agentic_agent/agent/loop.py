@@ -991,6 +991,7 @@ class AgentLoopRunner:
         action_results: list[dict[str, Any]],
     ) -> set[str]:
         workspace = Path(state.workspace)
+        workspace_root = workspace.resolve()
         snapshotted: set[str] = set()
         output_extract_actions = {
             "run_python_code",
@@ -1020,7 +1021,9 @@ class AgentLoopRunner:
 
             for raw in candidate_paths:
                 try:
-                    rel = self.store.snapshot_workspace_file(state.run_id, workspace, str(raw))
+                    rel = self.store.snapshot_workspace_file(
+                        state.run_id, workspace_root, str(raw), workspace_resolved=True
+                    )
                     if rel in snapshotted:
                         continue
                     snapshotted.add(rel)
@@ -1138,7 +1141,7 @@ class AgentLoopRunner:
             if not changed:
                 continue
             try:
-                path = self.store.snapshot_workspace_file(state.run_id, root, rel)
+                path = self.store.snapshot_workspace_file(state.run_id, root, rel, workspace_resolved=True)
                 if path in snapshotted:
                     continue
                 snapshotted.add(path)
@@ -341,6 +341,13 @@ def _shutdown_retention() -> None:
     _retention_stop.set()
 
 
+@app.on_event("shutdown")
+def _shutdown_store() -> None:
+    _store.close()
+    _schedule_store.close()
+    _skill_build_store.close()
+
+
 _SKILLS_EVENT_RE = re.compile(r"skills selected iteration=\d+ names=(.+)$")
 
 
@@ -654,14 +661,11 @@ def stream_run(
             return _sse_pack(event, data, event_id=current_id)
 
         while True:
-            if max_events > 0 and emitted >= max_events:
-                break
-
             state = _store.read_state(run_id)
             changed = False
 
             if state.iteration != sent_iteration:
-                items = _store.read_iterations(run_id)
+                items = list(_store.iter_iterations(run_id, limit=1))
                 if items:
                     payload = emit("iteration", items[-1])
                     if payload is not None:
@@ -700,6 +704,9 @@ def stream_run(
             if not changed:
                 yield ": keep-alive\n\n"
                 emitted += 1
+            # Stop as soon as the cap is reached instead of sleeping through one more poll.
+            if max_events > 0 and emitted >= max_events:
+                break
             time.sleep(poll_ms / 1000)
 
     return StreamingResponse(event_gen(), media_type="text/event-stream")
@@ -54,17 +54,18 @@ def run(
 
     resolved = _resolve_run_options(settings, provider, model, max_iters, workspace, skills_dir)
     runner = build_runner(settings, provider_name=resolved["provider"], model=resolved["model"])
-    state = _run_with_spinner(
-        "Running agent",
-        lambda: runner.start_run(
-            task=task,
-            provider_name=resolved["provider"],
-            model=resolved["model"],
-            workspace=resolved["workspace"],
-            skills_dir=resolved["skills_dir"],
-            max_iters=resolved["max_iters"],
-        ),
-    )
+    with runner.store:
+        state = _run_with_spinner(
+            "Running agent",
+            lambda: runner.start_run(
+                task=task,
+                provider_name=resolved["provider"],
+                model=resolved["model"],
+                workspace=resolved["workspace"],
+                skills_dir=resolved["skills_dir"],
+                max_iters=resolved["max_iters"],
+            ),
+        )
     typer.echo(f"run_id={state.run_id}")
     typer.echo(f"status={state.status.value}")
     typer.echo(f"stop_reason={state.stop_reason.value if state.stop_reason else 'n/a'}")
@@ -80,10 +81,11 @@ def resume(run_id: str = typer.Option(..., "--run-id")) -> None:
         # provider/model from state; provider argument is only needed for initial provider wiring.
         from softnix_agentic_agent.storage.filesystem_store import FilesystemStore
 
-        store = FilesystemStore(settings.runs_dir)
-        state = store.read_state(run_id)
+        with FilesystemStore(settings.runs_dir) as store:
+            state = store.read_state(run_id)
         runner = build_runner(settings, provider_name=state.provider, model=state.model)
-        new_state = runner.resume_run(run_id)
+        with runner.store:
+            new_state = runner.resume_run(run_id)
         typer.echo(f"run_id={new_state.run_id}")
         typer.echo(f"status={new_state.status.value}")
         typer.echo(f"stop_reason={new_state.stop_reason.value if new_state.stop_reason else 'n/a'}")
@@ -51,6 +51,14 @@ class SkillBuildService:
         thread.start()
         return self.store.get_job(job["id"])
 
+    def wait(self, job_id: str, timeout: float | None = None) -> bool:
+        """Block until the build worker for job_id exits; return False if it is still running."""
+        thread = self._threads.get(job_id)
+        if thread is None:
+            return True
+        thread.join(timeout=timeout)
+        return not thread.is_alive()
+
     def get_build(self, job_id: str) -> dict[str, Any]:
         return self.store.get_job(job_id)
 
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, BinaryIO
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    # Readers poll these files while they are rewritten; never expose a truncated document.
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with tmp.open("wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_json(path: Path, obj: dict[str, Any]) -> None:
+    atomic_write_bytes(path, json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+class AppendHandleCache:
+    """LRU of unbuffered append-mode handles, so hot logs skip an open/close per line."""
+
+    def __init__(self, max_handles: int = 32) -> None:
+        self._max_handles = max(1, int(max_handles))
+        self._lock = threading.Lock()
+        self._handles: OrderedDict[str, BinaryIO] = OrderedDict()
+
+    def __contains__(self, path: object) -> bool:
+        with self._lock:
+            return str(path) in self._handles
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._handles)
+
+    def append(self, path: Path | str, data: bytes) -> None:
+        key = str(path)
+        with self._lock:
+            handle = self._handles.pop(key, None)
+            # A trimmed-and-replaced or deleted file leaves the cached handle on an unlinked inode.
+            if handle is not None and os.fstat(handle.fileno()).st_nlink == 0:
+                handle.close()
+                handle = None
+            if handle is None:
+                handle = open(key, "ab", buffering=0)
+            self._handles[key] = handle
+            while len(self._handles) > self._max_handles:
+                _, stale = self._handles.popitem(last=False)
+                stale.close()
+            handle.write(data)
+
+    def discard(self, path: Path | str) -> None:
+        with self._lock:
+            handle = self._handles.pop(str(path), None)
+        if handle is not None:
+            handle.close()
+
+    def close(self) -> None:
+        with self._lock:
+            while self._handles:
+                _, handle = self._handles.popitem(last=False)
+                handle.close()
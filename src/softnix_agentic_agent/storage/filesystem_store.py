@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from collections import OrderedDict, deque
+import dataclasses
 import json
+import os
 from pathlib import Path
 import re
 import shutil
-from typing import Any
+import threading
+from typing import Any, Iterable, Iterator
 
+from softnix_agentic_agent.storage.fileio import AppendHandleCache, atomic_write_bytes
 from softnix_agentic_agent.types import IterationRecord, RunState, utc_now_iso
 
+_MAX_APPEND_HANDLES = 32
+_MAX_CACHED_STATES = 256
+_MAX_CACHED_RUN_PATHS = 4096
+
 
 class FilesystemStore:
     def __init__(self, runs_dir: Path) -> None:
@@ -20,10 +29,33 @@ class FilesystemStore:
         self.experience_file = self.experience_dir / "success_cases.jsonl"
         self.failure_experience_file = self.experience_dir / "failure_cases.jsonl"
         self.strategy_outcomes_file = self.experience_dir / "strategy_outcomes.jsonl"
+        self._append_handles = AppendHandleCache(_MAX_APPEND_HANDLES)
+        self._state_lock = threading.Lock()
+        self._state_cache: OrderedDict[str, tuple[tuple[int, int, int], RunState]] = OrderedDict()
+        self._run_paths: dict[tuple[str, str], Path] = {}
+
+    def close(self) -> None:
+        self._append_handles.close()
+
+    def __enter__(self) -> FilesystemStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def run_dir(self, run_id: str) -> Path:
         return self.runs_dir / run_id
 
+    def _run_path(self, run_id: str, name: str) -> Path:
+        key = (run_id, name)
+        path = self._run_paths.get(key)
+        if path is None:
+            if len(self._run_paths) >= _MAX_CACHED_RUN_PATHS:
+                self._run_paths.clear()
+            path = self.run_dir(run_id) / name
+            self._run_paths[key] = path
+        return path
+
     def list_run_ids(self) -> list[str]:
         if not self.runs_dir.exists():
             return []
@@ -31,76 +63,77 @@ class FilesystemStore:
         return sorted(ids)
 
     def init_run(self, state: RunState) -> None:
-        rd = self.run_dir(state.run_id)
-        (rd / "artifacts").mkdir(parents=True, exist_ok=True)
+        self._run_path(state.run_id, "artifacts").mkdir(parents=True, exist_ok=True)
         self.write_state(state)
         self.log_event(state.run_id, f"run initialized task={state.task!r}")
 
     def write_state(self, state: RunState) -> None:
-        rd = self.run_dir(state.run_id)
-        rd.mkdir(parents=True, exist_ok=True)
-        p = rd / "state.json"
-        with p.open("w", encoding="utf-8") as f:
-            json.dump(state.to_dict(), f, indent=2, ensure_ascii=False)
+        self.run_dir(state.run_id).mkdir(parents=True, exist_ok=True)
+        p = self._run_path(state.run_id, "state.json")
+        atomic_write_bytes(p, json.dumps(state.to_dict(), indent=2, ensure_ascii=False).encode("utf-8"))
+        with self._state_lock:
+            self._state_cache.pop(state.run_id, None)
 
     def read_state(self, run_id: str) -> RunState:
-        p = self.run_dir(run_id) / "state.json"
-        data = json.loads(p.read_text(encoding="utf-8"))
-        return RunState.from_dict(data)
+        p = self._run_path(run_id, "state.json")
+        st = p.stat()
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._state_lock:
+            cached = self._state_cache.get(run_id)
+            if cached is not None and cached[0] == key:
+                self._state_cache.move_to_end(run_id)
+                return dataclasses.replace(cached[1])
+        data = json.loads(p.read_bytes())
+        state = RunState.from_dict(data)
+        with self._state_lock:
+            self._state_cache[run_id] = (key, dataclasses.replace(state))
+            self._state_cache.move_to_end(run_id)
+            while len(self._state_cache) > _MAX_CACHED_STATES:
+                self._state_cache.popitem(last=False)
+        return state
 
     def append_iteration(self, record: IterationRecord) -> None:
-        p = self.run_dir(record.run_id) / "iterations.jsonl"
-        with p.open("a", encoding="utf-8") as f:
-            line = {
-                "run_id": record.run_id,
-                "iteration": record.iteration,
-                "timestamp": record.timestamp,
-                "prompt": record.prompt,
-                "plan": record.plan,
-                "actions": record.actions,
-                "action_results": record.action_results,
-                "output": record.output,
-                "done": record.done,
-                "error": record.error,
-                "token_usage": record.token_usage,
-            }
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        p = self._run_path(record.run_id, "iterations.jsonl")
+        self._append_line(p, json.dumps(record.to_dict(), ensure_ascii=False))
 
     def read_iterations(self, run_id: str) -> list[dict[str, Any]]:
-        p = self.run_dir(run_id) / "iterations.jsonl"
+        return list(self.iter_iterations(run_id))
+
+    def iter_iterations(self, run_id: str, limit: int | None = None) -> Iterator[dict[str, Any]]:
+        p = self._run_path(run_id, "iterations.jsonl")
         if not p.exists():
-            return []
-        rows = []
-        for line in p.read_text(encoding="utf-8").splitlines():
-            if line.strip():
-                rows.append(json.loads(line))
-        return rows
+            return
+        with p.open("r", encoding="utf-8") as f:
+            lines: Iterable[str] = f
+            if limit is not None:
+                if limit <= 0:
+                    return
+                lines = deque((line for line in f if line.strip()), maxlen=int(limit))
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
 
     def read_events(self, run_id: str) -> list[str]:
-        p = self.run_dir(run_id) / "events.log"
+        p = self._run_path(run_id, "events.log")
         if not p.exists():
             return []
         return [line for line in p.read_text(encoding="utf-8").splitlines() if line.strip()]
 
     def list_artifacts(self, run_id: str) -> list[str]:
-        artifacts_dir = self.run_dir(run_id) / "artifacts"
-        if not artifacts_dir.exists():
-            return []
-        files = [str(p.relative_to(artifacts_dir)) for p in artifacts_dir.rglob("*") if p.is_file()]
-        return sorted(files)
+        artifacts_dir = self._run_path(run_id, "artifacts")
+        return sorted(rel for rel, _ in _walk_files(artifacts_dir))
 
     def list_artifact_entries(self, run_id: str) -> list[dict[str, Any]]:
-        artifacts_dir = self.run_dir(run_id) / "artifacts"
-        if not artifacts_dir.exists():
-            return []
+        artifacts_dir = self._run_path(run_id, "artifacts")
         entries: list[dict[str, Any]] = []
-        for path in artifacts_dir.rglob("*"):
-            if not path.is_file():
+        for rel, entry in _walk_files(artifacts_dir):
+            try:
+                stat = entry.stat()
+            except OSError:
                 continue
-            stat = path.stat()
             entries.append(
                 {
-                    "path": str(path.relative_to(artifacts_dir)),
+                    "path": rel,
                     "size": int(stat.st_size),
                     "modified_at": stat.st_mtime,
                 }
@@ -109,36 +142,41 @@ class FilesystemStore:
         return entries
 
     def resolve_artifact_path(self, run_id: str, artifact_path: str) -> Path:
-        artifacts_dir = (self.run_dir(run_id) / "artifacts").resolve()
+        artifacts_dir = self._run_path(run_id, "artifacts").resolve()
         target = (artifacts_dir / artifact_path).resolve()
         if not _is_within(target, artifacts_dir):
             raise ValueError("artifact path escapes artifacts directory")
         return target
 
-    def snapshot_workspace_file(self, run_id: str, workspace: Path, file_path: str) -> str:
-        workspace_root = workspace.resolve()
+    def snapshot_workspace_file(
+        self,
+        run_id: str,
+        workspace: Path,
+        file_path: str,
+        *,
+        workspace_resolved: bool = False,
+    ) -> str:
+        workspace_root = workspace if workspace_resolved else workspace.resolve()
         source = (workspace_root / file_path).resolve()
         if not _is_within(source, workspace_root):
             raise ValueError("workspace file path escapes workspace")
-        if not source.exists() or not source.is_file():
+        if not source.is_file():
             raise FileNotFoundError(f"workspace file not found: {source}")
 
         rel = str(source.relative_to(workspace_root))
-        dest = self.run_dir(run_id) / "artifacts" / rel
+        dest = self._run_path(run_id, "artifacts") / rel
         dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(source, dest)
+        _copy_file(source, dest)
         return rel
 
     def log_event(self, run_id: str, message: str) -> None:
-        p = self.run_dir(run_id) / "events.log"
-        with p.open("a", encoding="utf-8") as f:
-            f.write(f"{utc_now_iso()} {message}\n")
+        p = self._run_path(run_id, "events.log")
+        self._append_line(p, f"{utc_now_iso()} {message}")
 
     def append_memory_audit(self, run_id: str, payload: dict[str, Any]) -> None:
-        p = self.run_dir(run_id) / "memory_audit.jsonl"
+        p = self._run_path(run_id, "memory_audit.jsonl")
         line = {"ts": utc_now_iso(), **payload}
-        with p.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._append_line(p, json.dumps(line, ensure_ascii=False))
 
     def write_reference_context(self, channel: str, owner_id: str, payload: dict[str, Any]) -> None:
         p = self._context_ref_path(channel=channel, owner_id=owner_id)
@@ -152,17 +190,20 @@ class FilesystemStore:
         if not p.exists():
             return {}
         try:
-            return json.loads(p.read_text(encoding="utf-8"))
+            return json.loads(p.read_bytes())
         except Exception:
             return {}
 
+    def _append_line(self, path: Path, line: str) -> None:
+        self._append_handles.append(path, (line + "\n").encode("utf-8"))
+
     def _context_ref_path(self, channel: str, owner_id: str) -> Path:
         c = re.sub(r"[^a-zA-Z0-9_.-]+", "_", str(channel or "").strip()) or "default"
         o = re.sub(r"[^a-zA-Z0-9_.-]+", "_", str(owner_id or "").strip()) or "default"
         return self.context_refs_dir / f"{c}__{o}.json"
 
     def read_memory_audit(self, run_id: str) -> list[dict[str, Any]]:
-        p = self.run_dir(run_id) / "memory_audit.jsonl"
+        p = self._run_path(run_id, "memory_audit.jsonl")
         if not p.exists():
             return []
         rows: list[dict[str, Any]] = []
@@ -185,8 +226,7 @@ class FilesystemStore:
 
     def append_success_experience(self, payload: dict[str, Any], max_items: int = 1000) -> None:
         line = {"ts": utc_now_iso(), **payload}
-        with self.experience_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._append_line(self.experience_file, json.dumps(line, ensure_ascii=False))
 
         cap = max(10, int(max_items))
         rows = self.read_success_experiences(limit=cap + 50)
@@ -229,19 +269,20 @@ class FilesystemStore:
             return []
         current_skills = {str(x).strip().lower() for x in selected_skills if str(x).strip()}
         rows = self.read_success_experiences(limit=max(10, int(max_scan)))
+        min_quality = float(min_quality_score)
         scored: list[tuple[int, dict[str, Any]]] = []
         for row in rows:
             if str(row.get("status", "")).lower() not in {"completed", "success", "ok"}:
                 continue
-            if not _experience_quality_ok(row):
+            if not _experience_intent_compatible(row=row, task_intent=task_intent):
                 continue
             row_quality = _experience_quality_score(row)
-            if row_quality < float(min_quality_score):
+            if row_quality < min_quality:
                 continue
-            if not _experience_intent_compatible(row=row, task_intent=task_intent):
+            if not _experience_quality_ok(row):
                 continue
             past_tokens = {str(x).strip().lower() for x in row.get("task_tokens", []) if str(x).strip()}
-            token_overlap = len(task_tokens.intersection(past_tokens))
+            token_overlap = len(task_tokens & past_tokens)
             if token_overlap <= 0:
                 continue
             past_skills = {str(x).strip().lower() for x in row.get("selected_skills", []) if str(x).strip()}
@@ -254,8 +295,7 @@ class FilesystemStore:
 
     def append_failure_experience(self, payload: dict[str, Any], max_items: int = 1000) -> None:
         line = {"ts": utc_now_iso(), **payload}
-        with self.failure_experience_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._append_line(self.failure_experience_file, json.dumps(line, ensure_ascii=False))
 
         cap = max(10, int(max_items))
         rows = self.read_failure_experiences(limit=cap + 50)
@@ -297,6 +337,7 @@ class FilesystemStore:
             return []
         current_skills = {str(x).strip().lower() for x in selected_skills if str(x).strip()}
         rows = self.read_failure_experiences(limit=max(10, int(max_scan)))
+        strategy_scores: dict[str, float] | None = None
         scored: list[tuple[int, dict[str, Any]]] = []
         for row in rows:
             if str(row.get("status", "")).lower() not in {"failed", "error"}:
@@ -304,14 +345,18 @@ class FilesystemStore:
             if not _experience_intent_compatible(row=row, task_intent=task_intent):
                 continue
             past_tokens = {str(x).strip().lower() for x in row.get("task_tokens", []) if str(x).strip()}
-            token_overlap = len(task_tokens.intersection(past_tokens))
+            token_overlap = len(task_tokens & past_tokens)
             if token_overlap <= 0:
                 continue
             past_skills = {str(x).strip().lower() for x in row.get("selected_skills", []) if str(x).strip()}
             skill_overlap = len(current_skills.intersection(past_skills)) if current_skills else 0
             has_strategy = 1 if str(row.get("recommended_strategy", "")).strip() else 0
             strategy_key = str(row.get("strategy_key", "")).strip()
-            strategy_score = self.get_strategy_effectiveness_score(strategy_key) if strategy_key else 0.0
+            strategy_score = 0.0
+            if strategy_key:
+                if strategy_scores is None:
+                    strategy_scores = self.get_strategy_effectiveness_scores()
+                strategy_score = strategy_scores.get(strategy_key, 0.0)
             intent_bonus = _experience_intent_bonus(row=row, task_intent=task_intent)
             score = token_overlap + (skill_overlap * 2) + (has_strategy * 2) + strategy_score + intent_bonus
             scored.append((score, row))
@@ -337,8 +382,7 @@ class FilesystemStore:
             "failure_class": str(failure_class).strip(),
             "run_id": str(run_id).strip(),
         }
-        with self.strategy_outcomes_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self._append_line(self.strategy_outcomes_file, json.dumps(line, ensure_ascii=False))
 
         cap = max(50, int(max_items))
         rows = self.read_strategy_outcomes(limit=cap + 100)
@@ -369,28 +413,73 @@ class FilesystemStore:
         key = str(strategy_key).strip()
         if not key:
             return 0.0
-        rows = self.read_strategy_outcomes(limit=max_scan)
-        wins = 0
-        losses = 0
-        for row in rows:
-            if str(row.get("strategy_key", "")).strip() != key:
+        return self.get_strategy_effectiveness_scores(max_scan=max_scan).get(key, 0.0)
+
+    def get_strategy_effectiveness_scores(self, max_scan: int = 1200) -> dict[str, float]:
+        tallies: dict[str, list[int]] = {}
+        for row in self.read_strategy_outcomes(limit=max_scan):
+            key = str(row.get("strategy_key", "")).strip()
+            if not key:
                 continue
-            if bool(row.get("success", False)):
-                wins += 1
-            else:
-                losses += 1
-        total = wins + losses
-        if total <= 0:
-            return 0.0
-        win_rate = wins / total
-        confidence = min(1.0, total / 8.0)
-        # normalized around 0; positive means historically effective.
-        return (win_rate - 0.5) * 6.0 * confidence
+            counts = tallies.setdefault(key, [0, 0])
+            counts[0 if bool(row.get("success", False)) else 1] += 1
+        scores: dict[str, float] = {}
+        for key, (wins, losses) in tallies.items():
+            total = wins + losses
+            win_rate = wins / total
+            confidence = min(1.0, total / 8.0)
+            # normalized around 0; positive means historically effective.
+            scores[key] = (win_rate - 0.5) * 6.0 * confidence
+        return scores
+
+
+def _walk_files(root: Path) -> list[tuple[str, os.DirEntry[str]]]:
+    out: list[tuple[str, os.DirEntry[str]]] = []
+    stack: list[tuple[str, str]] = [(str(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{prefix}{entry.name}"
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{rel}{os.sep}"))
+                    elif entry.is_file():
+                        out.append((rel, entry))
+                except OSError:
+                    continue
+    return out
+
+
+def _copy_file(source: Path, dest: Path) -> None:
+    """Copy file data in-kernel when possible, then carry over metadata like copy2."""
+    copied = False
+    if hasattr(os, "copy_file_range"):
+        try:
+            with source.open("rb") as src, dest.open("wb") as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), min(remaining, 1 << 30))
+                    if sent == 0:
+                        break
+                    remaining -= sent
+            copied = remaining <= 0
+        except OSError:
+            copied = False
+    if not copied:
+        # shutil.copyfile already uses sendfile/fcopyfile where the platform offers them.
+        shutil.copyfile(source, dest)
+    shutil.copystat(source, dest)
 
 
 def _is_within(path: Path, root: Path) -> bool:
+    # Both sides must already be resolved by the caller.
     try:
-        path.resolve().relative_to(root.resolve())
+        path.relative_to(root)
         return True
     except ValueError:
         return False
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import threading
+from typing import Iterator
+
+
+class KeyedLocks:
+    """Per-key mutual exclusion; writers only contend when they touch the same id.
+
+    A key's lock exists only while some thread holds or waits for it, so ids that are
+    no longer written (deleted schedules, finished jobs) do not pin a lock forever.
+    """
+
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        # key -> [lock, holders + waiters]
+        self._entries: dict[str, list] = {}
+
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._entries)
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self._guard:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._entries[key]
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import json
+from operator import itemgetter
+import os
 from pathlib import Path
 import shutil
+import subprocess
 import threading
+import time
 from typing import Any
 
+from softnix_agentic_agent.storage.fileio import atomic_write_bytes
 from softnix_agentic_agent.types import RunStatus
 
 
@@ -24,6 +32,21 @@ class RetentionConfig:
     experience_success_max_items: int = 1000
     experience_failure_max_items: int = 1000
     experience_strategy_max_items: int = 4000
+    size_scan_workers: int = 8
+
+
+_PARALLEL_SIZE_SCAN_MIN = 4
+_ACTIVE_RUN_STATUSES = frozenset({RunStatus.RUNNING.value})
+_ACTIVE_SKILL_BUILD_STATUSES = frozenset({"queued", "running"})
+_FINISHED_RUN_STATUSES = frozenset(
+    {RunStatus.COMPLETED.value, RunStatus.FAILED.value, RunStatus.CANCELED.value}
+)
+_FINISHED_SKILL_BUILD_STATUSES = frozenset({"completed", "failed"})
+_RM_BIN = shutil.which("rm") if os.name == "posix" else None
+_RM_BATCH_SIZE = 1000
+_CLEANUP_INFLIGHT = "cleanup"
+_SCANDIR_SUPPORTS_FD = os.scandir in os.supports_fd and os.open in os.supports_dir_fd
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_NOFOLLOW", 0)
 
 
 class RunRetentionService:
@@ -38,27 +61,37 @@ class RunRetentionService:
         self.config = config
         self.skill_builds_dir = skill_builds_dir
         self.experience_dir = self.runs_dir.parent / "experience"
-        self._lock = threading.Lock()
+        self._inflight_lock = threading.Lock()
+        self._inflight: set[str] = set()
+        self._size_cache: dict[str, tuple[int, int, int]] = {}
+        self._disabled_counts_cache: tuple[float, int, int] | None = None
         self.runs_dir.mkdir(parents=True, exist_ok=True)
         self.experience_dir.mkdir(parents=True, exist_ok=True)
         if self.skill_builds_dir is not None:
             self.skill_builds_dir.mkdir(parents=True, exist_ok=True)
 
     def report(self, now: datetime | None = None) -> dict[str, Any]:
+        if now is None and not self.config.enabled:
+            return self._disabled_report()
+        return self._build_report(now)
+
+    def _build_report(self, now: datetime | None = None) -> dict[str, Any]:
         now_utc = now or datetime.now(timezone.utc)
         runs_items = self._collect_run_items(now_utc)
-        runs_selected = self._select_run_deletions(runs_items, now_utc)
+        runs_selected, runs_reclaimable_bytes = self._select_run_deletions(runs_items, now_utc)
         runs_selected_ids = {str(row["run_id"]) for row in runs_selected}
-        runs_total_bytes = sum(int(row["size_bytes"]) for row in runs_items)
-        runs_reclaimable_bytes = sum(int(row["size_bytes"]) for row in runs_selected)
+        runs_total_bytes, runs_sizes_complete, runs_active, runs_finished = _summarize_items(
+            runs_items, active_statuses=_ACTIVE_RUN_STATUSES
+        )
         runs_remaining = len(runs_items) - len(runs_selected)
         runs_remaining_bytes = runs_total_bytes - runs_reclaimable_bytes
 
         skill_items = self._collect_skill_build_items(now_utc)
-        skill_selected = self._select_skill_build_deletions(skill_items, now_utc)
+        skill_selected, skill_reclaimable_bytes = self._select_skill_build_deletions(skill_items, now_utc)
         skill_selected_ids = {str(row["job_id"]) for row in skill_selected}
-        skill_total_bytes = sum(int(row["size_bytes"]) for row in skill_items)
-        skill_reclaimable_bytes = sum(int(row["size_bytes"]) for row in skill_selected)
+        skill_total_bytes, skill_sizes_complete, skill_active, skill_finished = _summarize_items(
+            skill_items, active_statuses=_ACTIVE_SKILL_BUILD_STATUSES
+        )
         skill_remaining = len(skill_items) - len(skill_selected)
         skill_remaining_bytes = skill_total_bytes - skill_reclaimable_bytes
 
@@ -73,24 +106,14 @@ class RunRetentionService:
             experience_report["summary"]["planned_trim_files"]
         )
         return {
-            "policy": {
-                "enabled": self.config.enabled,
-                "interval_sec": float(self.config.interval_sec),
-                "keep_finished_days": int(self.config.keep_finished_days),
-                "max_runs": int(self.config.max_runs),
-                "max_bytes": int(self.config.max_bytes),
-                "skill_builds_keep_finished_days": int(self.config.skill_builds_keep_finished_days),
-                "skill_builds_max_jobs": int(self.config.skill_builds_max_jobs),
-                "skill_builds_max_bytes": int(self.config.skill_builds_max_bytes),
-                "experience_success_max_items": int(self.config.experience_success_max_items),
-                "experience_failure_max_items": int(self.config.experience_failure_max_items),
-                "experience_strategy_max_items": int(self.config.experience_strategy_max_items),
-            },
+            "policy": self._policy_payload(),
+            "scanned": True,
             "summary": {
                 "total_runs": len(runs_items),
                 "total_bytes": runs_total_bytes,
-                "active_runs": sum(1 for row in runs_items if str(row["status"]) == RunStatus.RUNNING.value),
-                "finished_runs": sum(1 for row in runs_items if bool(row["finished"])),
+                "sizes_complete": runs_sizes_complete,
+                "active_runs": runs_active,
+                "finished_runs": runs_finished,
                 "planned_delete_runs": len(runs_selected),
                 "planned_reclaim_bytes": runs_reclaimable_bytes,
                 "remaining_runs_after_cleanup": runs_remaining,
@@ -103,8 +126,9 @@ class RunRetentionService:
                 "summary": {
                     "total_jobs": len(skill_items),
                     "total_bytes": skill_total_bytes,
-                    "active_jobs": sum(1 for row in skill_items if str(row["status"]) in {"queued", "running"}),
-                    "finished_jobs": sum(1 for row in skill_items if bool(row["finished"])),
+                    "sizes_complete": skill_sizes_complete,
+                    "active_jobs": skill_active,
+                    "finished_jobs": skill_finished,
                     "planned_delete_jobs": len(skill_selected),
                     "planned_reclaim_bytes": skill_reclaimable_bytes,
                     "remaining_jobs_after_cleanup": skill_remaining,
@@ -122,10 +146,15 @@ class RunRetentionService:
         }
 
     def run_cleanup(self, *, dry_run: bool = True, now: datetime | None = None) -> dict[str, Any]:
-        if not self._lock.acquire(blocking=False):
-            return {"status": "busy", "dry_run": dry_run}
+        if not dry_run:
+            # Only deleting cleanups are exclusive; the lock is held just to reserve the slot,
+            # so dry runs (plain reports) keep working while a long delete is in progress.
+            with self._inflight_lock:
+                if _CLEANUP_INFLIGHT in self._inflight:
+                    return {"status": "busy", "dry_run": dry_run}
+                self._inflight.add(_CLEANUP_INFLIGHT)
         try:
-            payload = self.report(now=now)
+            payload = self._build_report(now=now)
             planned_runs = payload.get("planned_deletions", [])
             planned_skill_builds = payload.get("skill_builds", {}).get("planned_deletions", [])
             planned_experience = payload.get("experience", {}).get("planned_trims", [])
@@ -135,32 +164,35 @@ class RunRetentionService:
             deleted_bytes = 0
             errors: list[dict[str, str]] = []
             if not dry_run:
+                # (id field, id, path, size_bytes) for every directory scheduled for removal.
+                targets: list[tuple[str, str, Path, int]] = []
                 for row in planned_runs:
                     run_id = str(row.get("run_id", "")).strip()
                     if not run_id:
                         continue
                     target = self.runs_dir / run_id
-                    try:
-                        if target.exists() and target.is_dir():
-                            size_bytes = int(row.get("size_bytes", 0))
-                            shutil.rmtree(target)
-                            deleted.append(run_id)
-                            deleted_bytes += max(0, size_bytes)
-                    except Exception as exc:  # pragma: no cover
-                        errors.append({"run_id": run_id, "error": str(exc)})
+                    if target.is_dir():
+                        targets.append(("run_id", run_id, target, int(row.get("size_bytes", 0))))
                 for row in planned_skill_builds:
                     job_id = str(row.get("job_id", "")).strip()
                     if not job_id or self.skill_builds_dir is None:
                         continue
                     target = self.skill_builds_dir / job_id
+                    if target.is_dir():
+                        targets.append(("job_id", job_id, target, int(row.get("size_bytes", 0))))
+                _rm_rf([target for _, _, target, _ in targets])
+                for id_field, item_id, target, size_bytes in targets:
                     try:
-                        if target.exists() and target.is_dir():
-                            size_bytes = int(row.get("size_bytes", 0))
+                        if os.path.lexists(target):
                             shutil.rmtree(target)
-                            deleted_skill_build_ids.append(job_id)
-                            deleted_bytes += max(0, size_bytes)
                     except Exception as exc:  # pragma: no cover
-                        errors.append({"job_id": job_id, "error": str(exc)})
+                        errors.append({id_field: item_id, "error": str(exc)})
+                        continue
+                    if id_field == "run_id":
+                        deleted.append(item_id)
+                    else:
+                        deleted_skill_build_ids.append(item_id)
+                    deleted_bytes += max(0, size_bytes)
                 for row in planned_experience:
                     rel_path = str(row.get("path", "")).strip()
                     if not rel_path:
@@ -187,116 +219,126 @@ class RunRetentionService:
                 "errors": errors,
             }
         finally:
-            self._lock.release()
+            if not dry_run:
+                with self._inflight_lock:
+                    self._inflight.discard(_CLEANUP_INFLIGHT)
 
-    def _collect_run_items(self, now: datetime) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
-        if not self.runs_dir.exists():
-            return items
+    def _policy_payload(self) -> dict[str, Any]:
+        return {
+            "enabled": self.config.enabled,
+            "interval_sec": float(self.config.interval_sec),
+            "keep_finished_days": int(self.config.keep_finished_days),
+            "max_runs": int(self.config.max_runs),
+            "max_bytes": int(self.config.max_bytes),
+            "skill_builds_keep_finished_days": int(self.config.skill_builds_keep_finished_days),
+            "skill_builds_max_jobs": int(self.config.skill_builds_max_jobs),
+            "skill_builds_max_bytes": int(self.config.skill_builds_max_bytes),
+            "experience_success_max_items": int(self.config.experience_success_max_items),
+            "experience_failure_max_items": int(self.config.experience_failure_max_items),
+            "experience_strategy_max_items": int(self.config.experience_strategy_max_items),
+        }
 
-        for run_path in sorted(self.runs_dir.iterdir(), key=lambda p: p.name):
-            if not run_path.is_dir():
-                continue
-            state_path = run_path / "state.json"
-            if not state_path.exists():
-                continue
-            state = self._read_state_safe(state_path)
-            if state is None:
-                continue
-            status = str(state.get("status", "")).strip().lower()
-            updated_at_raw = str(state.get("updated_at", "")).strip()
-            created_at_raw = str(state.get("created_at", "")).strip()
-            updated_at = _parse_iso_datetime(updated_at_raw) or _parse_iso_datetime(created_at_raw)
-            if updated_at is None:
-                updated_at = datetime.fromtimestamp(run_path.stat().st_mtime, tz=timezone.utc)
-            age_days = max(0.0, (now - updated_at).total_seconds() / 86400.0)
-            size_bytes = _dir_size_bytes(run_path)
-            finished = status in {
-                RunStatus.COMPLETED.value,
-                RunStatus.FAILED.value,
-                RunStatus.CANCELED.value,
-            }
-            items.append(
-                {
-                    "run_id": run_path.name,
-                    "status": status or RunStatus.RUNNING.value,
-                    "finished": finished,
-                    "updated_at": updated_at.isoformat(),
-                    "age_days": round(age_days, 3),
-                    "size_bytes": size_bytes,
-                    "path": str(run_path),
-                }
-            )
+    def _disabled_report(self) -> dict[str, Any]:
+        # Retention is off: skip the tree walks and only count entries, refreshed once per interval.
+        # Only the counts are cached; every caller gets its own payload to mutate.
+        cached = self._disabled_counts_cache
+        now_mono = time.monotonic()
+        if cached is not None and now_mono - cached[0] < max(1.0, float(self.config.interval_sec)):
+            _, total_runs, total_jobs = cached
+        else:
+            total_runs = _count_subdirs(self.runs_dir)
+            total_jobs = _count_subdirs(self.skill_builds_dir) if self.skill_builds_dir is not None else 0
+            self._disabled_counts_cache = (now_mono, total_runs, total_jobs)
+        return {
+            "policy": self._policy_payload(),
+            "scanned": False,
+            "summary": {
+                "total_runs": total_runs,
+                "total_bytes": 0,
+                "sizes_complete": False,
+                "active_runs": 0,
+                "finished_runs": 0,
+                "planned_delete_runs": 0,
+                "planned_reclaim_bytes": 0,
+                "remaining_runs_after_cleanup": total_runs,
+                "remaining_bytes_after_cleanup": 0,
+            },
+            "items": [],
+            "planned_deletions": [],
+            "planned_deletion_ids": [],
+            "skill_builds": {
+                "summary": {
+                    "total_jobs": total_jobs,
+                    "total_bytes": 0,
+                    "sizes_complete": False,
+                    "active_jobs": 0,
+                    "finished_jobs": 0,
+                    "planned_delete_jobs": 0,
+                    "planned_reclaim_bytes": 0,
+                    "remaining_jobs_after_cleanup": total_jobs,
+                    "remaining_bytes_after_cleanup": 0,
+                },
+                "items": [],
+                "planned_deletions": [],
+                "planned_deletion_ids": [],
+            },
+            "experience": {
+                "summary": {"tracked_files": 0, "planned_trim_files": 0, "planned_reclaim_bytes": 0},
+                "items": [],
+                "planned_trims": [],
+            },
+            "overall": {"planned_delete_units": 0, "planned_reclaim_bytes": 0},
+        }
 
-        items.sort(key=lambda row: str(row["updated_at"]))
-        return items
+    def _collect_run_items(self, now: datetime) -> list[dict[str, Any]]:
+        return self._collect_items(
+            self.runs_dir,
+            now,
+            id_field="run_id",
+            default_status=RunStatus.RUNNING.value,
+            finished_statuses=_FINISHED_RUN_STATUSES,
+        )
 
-    def _select_run_deletions(self, items: list[dict[str, Any]], now: datetime) -> list[dict[str, Any]]:
-        if not items:
-            return []
+    def _select_run_deletions(
+        self, items: list[dict[str, Any]], now: datetime
+    ) -> tuple[list[dict[str, Any]], int]:
+        return self._select_oldest_finished(
+            items,
+            now,
+            keep_days=self.config.keep_finished_days,
+            max_count=self.config.max_runs,
+            max_bytes=self.config.max_bytes,
+        )
 
-        candidates = [row for row in items if bool(row.get("finished"))]
-        if not candidates:
+    def _collect_skill_build_items(self, now: datetime) -> list[dict[str, Any]]:
+        if self.skill_builds_dir is None:
             return []
+        return self._collect_items(
+            self.skill_builds_dir,
+            now,
+            id_field="job_id",
+            default_status="queued",
+            finished_statuses=_FINISHED_SKILL_BUILD_STATUSES,
+        )
 
-        keep_days = max(0, int(self.config.keep_finished_days))
-        cutoff = now - timedelta(days=keep_days)
-
-        selected: list[dict[str, Any]] = []
-        selected_ids: set[str] = set()
-
-        # Rule 1: age-based cleanup for finished runs.
-        for row in candidates:
-            updated_at = _parse_iso_datetime(str(row.get("updated_at", "")))
-            if updated_at is None:
-                continue
-            if updated_at <= cutoff:
-                run_id = str(row["run_id"])
-                selected.append(row)
-                selected_ids.add(run_id)
-
-        # Rule 2: total run count cap (protect running runs).
-        max_runs = max(1, int(self.config.max_runs))
-        remaining_count = len(items) - len(selected)
-        if remaining_count > max_runs:
-            needed = remaining_count - max_runs
-            for row in candidates:
-                run_id = str(row["run_id"])
-                if run_id in selected_ids:
-                    continue
-                selected.append(row)
-                selected_ids.add(run_id)
-                needed -= 1
-                if needed <= 0:
-                    break
-
-        # Rule 3: bytes cap, delete oldest finished runs until under threshold.
-        max_bytes = max(0, int(self.config.max_bytes))
-        remaining_bytes = sum(int(row["size_bytes"]) for row in items if str(row["run_id"]) not in selected_ids)
-        if max_bytes > 0 and remaining_bytes > max_bytes:
-            for row in candidates:
-                run_id = str(row["run_id"])
-                if run_id in selected_ids:
-                    continue
-                selected.append(row)
-                selected_ids.add(run_id)
-                remaining_bytes -= int(row["size_bytes"])
-                if remaining_bytes <= max_bytes:
-                    break
-
-        selected.sort(key=lambda row: str(row["updated_at"]))
-        return selected
-
-    def _collect_skill_build_items(self, now: datetime) -> list[dict[str, Any]]:
+    def _collect_items(
+        self,
+        root: Path,
+        now: datetime,
+        *,
+        id_field: str,
+        default_status: str,
+        finished_statuses: frozenset[str],
+    ) -> list[dict[str, Any]]:
+        """Read each state.json under root once into an oldest-first row for selection and reporting."""
         items: list[dict[str, Any]] = []
-        if self.skill_builds_dir is None or not self.skill_builds_dir.exists():
-            return items
-
-        for job_dir in sorted(self.skill_builds_dir.iterdir(), key=lambda p: p.name):
-            if not job_dir.is_dir():
-                continue
-            state_path = job_dir / "state.json"
-            if not state_path.exists():
+        seen_paths: set[str] = set()
+        for entry in _scan_subdirs(root):
+            item_path = Path(entry.path)
+            state_path = item_path / "state.json"
+            try:
+                state_stat = state_path.stat()
+            except OSError:
                 continue
             state = self._read_state_safe(state_path)
             if state is None:
@@ -306,74 +348,93 @@ class RunRetentionService:
             created_at_raw = str(state.get("created_at", "")).strip()
             updated_at = _parse_iso_datetime(updated_at_raw) or _parse_iso_datetime(created_at_raw)
             if updated_at is None:
-                updated_at = datetime.fromtimestamp(job_dir.stat().st_mtime, tz=timezone.utc)
+                updated_at = datetime.fromtimestamp(entry.stat().st_mtime, tz=timezone.utc)
             age_days = max(0.0, (now - updated_at).total_seconds() / 86400.0)
-            size_bytes = _dir_size_bytes(job_dir)
-            finished = status in {"completed", "failed"}
-            items.append(
-                {
-                    "job_id": job_dir.name,
-                    "status": status or "queued",
-                    "finished": finished,
-                    "updated_at": updated_at.isoformat(),
-                    "age_days": round(age_days, 3),
-                    "size_bytes": size_bytes,
-                    "path": str(job_dir),
-                }
-            )
-        items.sort(key=lambda row: str(row["updated_at"]))
+            finished = status in finished_statuses
+            size_bytes = self._cached_dir_size(item_path, state_stat) if finished else None
+            seen_paths.add(str(item_path))
+            row = {
+                id_field: entry.name,
+                "status": status or default_status,
+                "finished": finished,
+                "updated_at": updated_at.isoformat(),
+                "age_days": round(age_days, 3),
+                "size_bytes": size_bytes,
+                "path": str(item_path),
+                "_updated_dt": updated_at,
+            }
+            if size_bytes is None:
+                # Walked lazily by the selector, only when a rule needs the size.
+                row["_state_stat"] = state_stat
+            items.append(row)
+
+        self._evict_size_cache(root, seen_paths)
+        items.sort(key=itemgetter("_updated_dt", id_field))
         return items
 
-    def _select_skill_build_deletions(self, items: list[dict[str, Any]], now: datetime) -> list[dict[str, Any]]:
-        if not items:
-            return []
-        candidates = [row for row in items if bool(row.get("finished"))]
-        if not candidates:
-            return []
+    def _select_skill_build_deletions(
+        self, items: list[dict[str, Any]], now: datetime
+    ) -> tuple[list[dict[str, Any]], int]:
+        return self._select_oldest_finished(
+            items,
+            now,
+            keep_days=self.config.skill_builds_keep_finished_days,
+            max_count=self.config.skill_builds_max_jobs,
+            max_bytes=self.config.skill_builds_max_bytes,
+        )
 
-        keep_days = max(0, int(self.config.skill_builds_keep_finished_days))
-        cutoff = now - timedelta(days=keep_days)
-        selected: list[dict[str, Any]] = []
-        selected_ids: set[str] = set()
+    def _select_oldest_finished(
+        self,
+        items: list[dict[str, Any]],
+        now: datetime,
+        *,
+        keep_days: int,
+        max_count: int,
+        max_bytes: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Apply the three retention rules to oldest-first items; return (selected, reclaim_bytes)."""
+        if not items:
+            return [], 0
 
-        for row in candidates:
-            updated_at = _parse_iso_datetime(str(row.get("updated_at", "")))
-            if updated_at is None:
-                continue
-            if updated_at <= cutoff:
-                job_id = str(row["job_id"])
-                selected.append(row)
-                selected_ids.add(job_id)
-
-        max_jobs = max(1, int(self.config.skill_builds_max_jobs))
-        remaining_count = len(items) - len(selected)
-        if remaining_count > max_jobs:
-            needed = remaining_count - max_jobs
-            for row in candidates:
-                job_id = str(row["job_id"])
-                if job_id in selected_ids:
-                    continue
-                selected.append(row)
-                selected_ids.add(job_id)
-                needed -= 1
-                if needed <= 0:
-                    break
-
-        max_bytes = max(0, int(self.config.skill_builds_max_bytes))
-        remaining_bytes = sum(int(row["size_bytes"]) for row in items if str(row["job_id"]) not in selected_ids)
-        if max_bytes > 0 and remaining_bytes > max_bytes:
-            for row in candidates:
-                job_id = str(row["job_id"])
-                if job_id in selected_ids:
-                    continue
-                selected.append(row)
-                selected_ids.add(job_id)
-                remaining_bytes -= int(row["size_bytes"])
-                if remaining_bytes <= max_bytes:
-                    break
+        max_bytes = max(0, int(max_bytes))
+        if max_bytes > 0:
+            # The bytes cap is measured against every item, so all sizes are needed.
+            self._fill_dir_sizes(items)
 
-        selected.sort(key=lambda row: str(row["updated_at"]))
-        return selected
+        candidates = [row for row in items if bool(row.get("finished"))]
+        if not candidates:
+            return [], 0
+
+        cutoff = now - timedelta(days=max(0, int(keep_days)))
+
+        # Candidates are oldest-first and every rule takes the oldest remaining ones,
+        # so the selection is always a prefix of candidates; `cut` marks its end.
+        cut = 0
+
+        # Rule 1: age-based cleanup for finished items.
+        while cut < len(candidates) and candidates[cut]["_updated_dt"] <= cutoff:
+            cut += 1
+
+        # Rule 2: total count cap (protect active items).
+        remaining_count = len(items) - cut
+        max_count = max(1, int(max_count))
+        if remaining_count > max_count:
+            cut = min(len(candidates), cut + remaining_count - max_count)
+
+        # Rule 3: bytes cap, delete oldest finished items until under threshold.
+        if max_bytes <= 0:
+            # Without a bytes cap only the selected items need sizes (for reclaim accounting).
+            self._fill_dir_sizes(candidates[:cut])
+            return candidates[:cut], sum(int(row["size_bytes"]) for row in candidates[:cut])
+        reclaim_bytes = sum(int(row["size_bytes"]) for row in candidates[:cut])
+        remaining_bytes = sum(int(row["size_bytes"]) for row in items) - reclaim_bytes
+        while cut < len(candidates) and remaining_bytes > max_bytes:
+            size_bytes = int(candidates[cut]["size_bytes"])
+            remaining_bytes -= size_bytes
+            reclaim_bytes += size_bytes
+            cut += 1
+
+        return candidates[:cut], reclaim_bytes
 
     def _build_experience_report(self) -> dict[str, Any]:
         files = [
@@ -415,18 +476,53 @@ class RunRetentionService:
     def _trim_jsonl_file(self, path: Path, *, max_items: int) -> int:
         if not path.exists():
             return 0
-        lines = [line for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
         cap = max(1, int(max_items))
-        if len(lines) <= cap:
+        kept: deque[bytes] = deque(maxlen=cap)
+        total = 0
+        with path.open("rb") as f:
+            for line in f:
+                if line.strip():
+                    total += 1
+                    kept.append(line if line.endswith(b"\n") else line + b"\n")
+        if total <= cap:
             return 0
-        kept = lines[-cap:]
-        path.write_text("\n".join(kept) + "\n", encoding="utf-8")
-        return len(lines) - len(kept)
+        atomic_write_bytes(path, b"".join(kept))
+        return total - len(kept)
+
+    def _cached_dir_size(self, path: Path, state_stat: os.stat_result) -> int | None:
+        # Finished runs/jobs stop rewriting state.json, so its stat pins the directory contents.
+        # Active ones keep growing underneath an unchanged state.json and are never cached.
+        cached = self._size_cache.get(str(path))
+        if cached is not None and cached[0] == state_stat.st_mtime_ns and cached[1] == state_stat.st_size:
+            return cached[2]
+        return None
+
+    def _fill_dir_sizes(self, rows: list[dict[str, Any]]) -> None:
+        pending = [row for row in rows if row["size_bytes"] is None]
+        if not pending:
+            return
+        paths = [Path(row["path"]) for row in pending]
+        workers = min(max(1, int(self.config.size_scan_workers)), len(paths))
+        if workers <= 1 or len(paths) < _PARALLEL_SIZE_SCAN_MIN:
+            sizes = [_dir_size_bytes(path) for path in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                sizes = list(pool.map(_dir_size_bytes, paths))
+        for row, size_bytes in zip(pending, sizes):
+            state_stat = row.pop("_state_stat")
+            row["size_bytes"] = size_bytes
+            if row["finished"]:
+                self._size_cache[row["path"]] = (state_stat.st_mtime_ns, state_stat.st_size, size_bytes)
+
+    def _evict_size_cache(self, parent: Path, seen_paths: set[str]) -> None:
+        prefix = str(parent) + os.sep
+        # Snapshot the keys: reports may run concurrently with a cleanup.
+        for key in [k for k in list(self._size_cache) if k.startswith(prefix) and k not in seen_paths]:
+            self._size_cache.pop(key, None)
 
     def _read_state_safe(self, state_path: Path) -> dict[str, Any] | None:
         try:
-            raw = state_path.read_text(encoding="utf-8")
-            data = json.loads(raw)
+            data = json.loads(state_path.read_bytes())
             if isinstance(data, dict):
                 return data
             return None
@@ -434,6 +530,7 @@ class RunRetentionService:
             return None
 
 
+@lru_cache(maxsize=4096)
 def _parse_iso_datetime(value: str) -> datetime | None:
     text = (value or "").strip()
     if not text:
@@ -449,23 +546,158 @@ def _parse_iso_datetime(value: str) -> datetime | None:
     return dt.astimezone(timezone.utc)
 
 
+def _summarize_items(
+    items: list[dict[str, Any]], *, active_statuses: frozenset[str]
+) -> tuple[int, bool, int, int]:
+    """Return (total_bytes, sizes_complete, active, finished).
+
+    Sizes the selection never needed stay None; total_bytes then only covers measured rows.
+    """
+    total_bytes = 0
+    sizes_complete = True
+    active = 0
+    finished = 0
+    for row in items:
+        # Selection is done by now; drop the private fields before the row is reported.
+        row.pop("_updated_dt", None)
+        row.pop("_state_stat", None)
+        if row["size_bytes"] is None:
+            sizes_complete = False
+        else:
+            total_bytes += int(row["size_bytes"])
+        if row["status"] in active_statuses:
+            active += 1
+        if row["finished"]:
+            finished += 1
+    return total_bytes, sizes_complete, active, finished
+
+
+def _scan_subdirs(path: Path) -> list[os.DirEntry[str]]:
+    try:
+        with os.scandir(path) as it:
+            return [entry for entry in it if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _count_subdirs(path: Path) -> int:
+    # Same is_dir() rule as _scan_subdirs, so disabled and scanned reports count alike.
+    try:
+        with os.scandir(path) as it:
+            return sum(1 for entry in it if entry.is_dir())
+    except OSError:
+        return 0
+
+
 def _dir_size_bytes(path: Path) -> int:
+    if _SCANDIR_SUPPORTS_FD:
+        try:
+            root_fd = os.open(path, _DIR_OPEN_FLAGS)
+        except OSError:
+            return 0
+        try:
+            return _dir_size_bytes_at(root_fd)
+        finally:
+            os.close(root_fd)
+
     total = 0
+    stack = [str(path)]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+def _dir_size_bytes_at(root_fd: int) -> int:
+    # Entries are stat'ed relative to an open directory fd (fstatat), so the kernel does not
+    # re-walk the full path for every file; scandir already reads dirents in getdents64 batches.
+    # The walk keeps an explicit stack of (parent fd, subdir name): deep trees cannot hit the
+    # recursion limit, and a parent fd is closed as soon as its last pending child is opened.
+    total, subdirs = _scan_dir_fd(root_fd)
+    stack = [(root_fd, name) for name in subdirs]
+    pending: dict[int, int] = {root_fd: len(subdirs)}
     try:
-        for node in path.rglob("*"):
-            if node.is_file():
-                total += node.stat().st_size
-    except Exception:
-        return total
+        while stack:
+            parent_fd, name = stack.pop()
+            try:
+                fd: int | None = os.open(name, _DIR_OPEN_FLAGS, dir_fd=parent_fd)
+            except OSError:
+                fd = None
+            pending[parent_fd] -= 1
+            if pending[parent_fd] == 0 and parent_fd != root_fd:
+                del pending[parent_fd]
+                os.close(parent_fd)
+            if fd is None:
+                continue
+            size_bytes, subdirs = _scan_dir_fd(fd)
+            total += size_bytes
+            if subdirs:
+                pending[fd] = len(subdirs)
+                stack.extend((fd, child) for child in subdirs)
+            else:
+                os.close(fd)
+    finally:
+        # Only reached with fds still open if the walk was interrupted.
+        for fd in pending:
+            if fd != root_fd:
+                os.close(fd)
     return total
 
 
+def _scan_dir_fd(dir_fd: int) -> tuple[int, list[str]]:
+    """Return (bytes of regular files, subdirectory names) directly inside dir_fd."""
+    total = 0
+    subdirs: list[str] = []
+    try:
+        with os.scandir(dir_fd) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total, subdirs
+
+
+def _rm_rf(paths: list[Path]) -> None:
+    # One native rm per batch handles large trees much faster than per-target shutil.rmtree.
+    # Callers check what is left afterwards and fall back to shutil.rmtree for it.
+    if not _RM_BIN or not paths:
+        return
+    for start in range(0, len(paths), _RM_BATCH_SIZE):
+        chunk = [str(path) for path in paths[start : start + _RM_BATCH_SIZE]]
+        try:
+            subprocess.run(
+                [_RM_BIN, "-rf", "--", *chunk],
+                check=False,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return
+
+
 def _jsonl_stats(path: Path) -> tuple[int, int]:
-    if not path.exists():
-        return 0, 0
     try:
-        raw = path.read_text(encoding="utf-8")
-    except Exception:
+        with path.open("rb") as f:
+            line_count = sum(1 for line in f if line.strip())
+            size_bytes = os.fstat(f.fileno()).st_size
+    except OSError:
         return 0, 0
-    lines = [line for line in raw.splitlines() if line.strip()]
-    return len(lines), path.stat().st_size if path.exists() else 0
+    return line_count, size_bytes
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+import calendar
 import json
+import os
 import threading
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 from zoneinfo import ZoneInfo
 
+from softnix_agentic_agent.storage.fileio import AppendHandleCache, atomic_write_json
+from softnix_agentic_agent.storage.locks import KeyedLocks
 from softnix_agentic_agent.types import utc_now_iso
 
+_MAX_RUN_LOG_HANDLES = 32
 
+
+@lru_cache(maxsize=4096)
 def _parse_iso_datetime(value: str) -> datetime:
     text = value.strip()
     if text.endswith("Z"):
@@ -22,11 +30,32 @@ def _parse_iso_datetime(value: str) -> datetime:
     return dt
 
 
+@lru_cache(maxsize=64)
+def _tz(name: str) -> ZoneInfo:
+    # ZoneInfo's own strong cache only keeps a handful of zones; pin the ones schedules use.
+    return ZoneInfo(name)
+
+
 def _cron_weekday(dt: datetime) -> int:
     # Python: Monday=0..Sunday=6 -> Cron: Sunday=0..Saturday=6
     return (dt.weekday() + 1) % 7
 
 
+def _bitmask(values: frozenset[int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+def _next_bit(mask: int, value: int) -> int | None:
+    # Smallest set bit at position >= value, i.e. the next allowed field value.
+    rest = mask >> value
+    if not rest:
+        return None
+    return value + (rest & -rest).bit_length() - 1
+
+
 def _expand_cron_field(raw: str, min_value: int, max_value: int) -> set[int]:
     values: set[int] = set()
     for part in raw.split(","):
@@ -60,60 +89,125 @@ def _expand_cron_field(raw: str, min_value: int, max_value: int) -> set[int]:
     return values
 
 
-@dataclass
+@dataclass(frozen=True)
 class CronSpec:
-    minute: set[int]
-    hour: set[int]
-    day_of_month: set[int]
-    month: set[int]
-    day_of_week: set[int]
+    minute: frozenset[int]
+    hour: frozenset[int]
+    day_of_month: frozenset[int]
+    month: frozenset[int]
+    day_of_week: frozenset[int]
     dom_any: bool
     dow_any: bool
+    # Allowed values packed as bit i == value i, so lookups are shifts instead of set probes.
+    _minute_mask: int = field(init=False, repr=False, compare=False)
+    _hour_mask: int = field(init=False, repr=False, compare=False)
+    _dom_mask: int = field(init=False, repr=False, compare=False)
+    _month_mask: int = field(init=False, repr=False, compare=False)
+    _dow_mask: int = field(init=False, repr=False, compare=False)
+    _day_matches: Callable[[int, int], bool] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_minute_mask", _bitmask(self.minute))
+        object.__setattr__(self, "_hour_mask", _bitmask(self.hour))
+        object.__setattr__(self, "_dom_mask", _bitmask(self.day_of_month))
+        object.__setattr__(self, "_month_mask", _bitmask(self.month))
+        object.__setattr__(self, "_dow_mask", _bitmask(self.day_of_week))
+        object.__setattr__(self, "_day_matches", self._build_day_matcher())
 
     @classmethod
     def parse(cls, expr: str) -> "CronSpec":
-        parts = expr.strip().split()
-        if len(parts) != 5:
-            raise ValueError("cron expression must have 5 fields")
-        minute_raw, hour_raw, dom_raw, month_raw, dow_raw = parts
-        return cls(
-            minute=_expand_cron_field(minute_raw, 0, 59),
-            hour=_expand_cron_field(hour_raw, 0, 23),
-            day_of_month=_expand_cron_field(dom_raw, 1, 31),
-            month=_expand_cron_field(month_raw, 1, 12),
-            day_of_week=_expand_cron_field(dow_raw, 0, 6),
-            dom_any=dom_raw.strip() == "*",
-            dow_any=dow_raw.strip() == "*",
-        )
+        # Specs are immutable, so one parsed instance per expression is shared across callers.
+        return _parse_cron_cached(expr)
 
     def matches(self, dt: datetime) -> bool:
-        if dt.minute not in self.minute or dt.hour not in self.hour:
+        if not (self._minute_mask >> dt.minute) & 1 or not (self._hour_mask >> dt.hour) & 1:
             return False
-        if dt.month not in self.month:
+        if not (self._month_mask >> dt.month) & 1:
             return False
 
-        dom_match = dt.day in self.day_of_month
-        dow_match = _cron_weekday(dt) in self.day_of_week
+        return self._day_matches(dt.day, _cron_weekday(dt))
+
+    def _build_day_matcher(self) -> Callable[[int, int], bool]:
+        # The DOM/DOW combination rule is fixed per spec; pick it once instead of on every check.
+        dom_mask = self._dom_mask
+        dow_mask = self._dow_mask
         if self.dom_any and self.dow_any:
-            day_match = True
-        elif self.dom_any:
-            day_match = dow_match
-        elif self.dow_any:
-            day_match = dom_match
-        else:
-            day_match = dom_match or dow_match
-        return day_match
+            return lambda day, weekday: True
+        if self.dom_any:
+            return lambda day, weekday: (dow_mask >> weekday) & 1 == 1
+        if self.dow_any:
+            return lambda day, weekday: (dom_mask >> day) & 1 == 1
+        return lambda day, weekday: ((dom_mask >> day) | (dow_mask >> weekday)) & 1 == 1
 
     def next_after(self, now: datetime, tz_name: str) -> datetime:
-        tz = ZoneInfo(tz_name)
-        cursor = now.astimezone(tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
-        max_steps = 60 * 24 * 366
-        for _ in range(max_steps):
-            if self.matches(cursor):
-                return cursor.astimezone(timezone.utc)
-            cursor += timedelta(minutes=1)
+        tz = _tz(tz_name)
+        # Search local wall-clock time field by field (month -> day -> hour -> minute),
+        # jumping straight to the next allowed value instead of stepping minute by minute.
+        # Fields are carried as plain ints; out-of-range values (month 13, hour 24, day past the
+        # month end) find no allowed value and carry into the next unit on the following pass.
+        start = now.astimezone(tz).replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+        limit = start + timedelta(minutes=60 * 24 * 366)
+        limit_key = (limit.year, limit.month, limit.day, limit.hour, limit.minute)
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        while (year, month, day, hour, minute) < limit_key:
+            next_month = _next_bit(self._month_mask, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+                continue
+
+            next_day = self._next_day(year, month, day)
+            if next_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+                continue
+
+            next_hour = _next_bit(self._hour_mask, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = _next_bit(self._minute_mask, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                continue
+            if (year, month, day, hour, next_minute) >= limit_key:
+                break
+            return datetime(year, month, day, hour, next_minute, tzinfo=tz).astimezone(timezone.utc)
         raise ValueError("unable to compute next cron run within one year")
 
+    def _next_day(self, year: int, month: int, day: int) -> int | None:
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        for candidate in range(day, days_in_month + 1):
+            # calendar: Monday=0 for day 1 -> Cron: Sunday=0
+            weekday = (first_weekday + candidate) % 7
+            if self._day_matches(candidate, weekday):
+                return candidate
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_cron_cached(expr: str) -> CronSpec:
+    parts = expr.strip().split()
+    if len(parts) != 5:
+        raise ValueError("cron expression must have 5 fields")
+    minute_raw, hour_raw, dom_raw, month_raw, dow_raw = parts
+    return CronSpec(
+        minute=frozenset(_expand_cron_field(minute_raw, 0, 59)),
+        hour=frozenset(_expand_cron_field(hour_raw, 0, 23)),
+        day_of_month=frozenset(_expand_cron_field(dom_raw, 1, 31)),
+        month=frozenset(_expand_cron_field(month_raw, 1, 12)),
+        day_of_week=frozenset(_expand_cron_field(dow_raw, 0, 6)),
+        dom_any=dom_raw.strip() == "*",
+        dow_any=dow_raw.strip() == "*",
+    )
+
 
 def compute_next_run_at(
     schedule_type: str,
@@ -136,11 +230,38 @@ def compute_next_run_at(
     raise ValueError("schedule_type must be one_time or cron")
 
 
+def _iter_lines_reversed(path: Path, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        head = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + head).split(b"\n")
+            # The first piece may continue in the previous block; carry it over.
+            head = lines.pop(0)
+            yield from reversed(lines)
+        yield head
+
+
 class ScheduleStore:
     def __init__(self, schedules_dir: Path) -> None:
         self.schedules_dir = schedules_dir
         self.schedules_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self._locks = KeyedLocks()
+        # file name -> ((mtime_ns, size, ino), parsed item); files are re-read only when their stat changes.
+        # The inode catches atomic same-size replacements within one coarse timestamp tick.
+        self._cache_lock = threading.Lock()
+        self._cache: dict[str, tuple[tuple[int, int, int], dict[str, Any]]] = {}
+        # Bumped on every cache change; the due index is rebuilt only when it moves.
+        self._cache_version = 0
+        self._due_index: list[tuple[datetime, str]] = []
+        self._due_index_version = -1
+        self._runs_handles = AppendHandleCache(_MAX_RUN_LOG_HANDLES)
+
+    def close(self) -> None:
+        self._runs_handles.close()
 
     def _schedule_path(self, schedule_id: str) -> Path:
         return self.schedules_dir / f"{schedule_id}.json"
@@ -149,8 +270,8 @@ class ScheduleStore:
         return self.schedules_dir / f"{schedule_id}.runs.jsonl"
 
     def create_schedule(self, payload: dict[str, Any]) -> dict[str, Any]:
-        with self._lock:
-            schedule_id = uuid.uuid4().hex[:12]
+        schedule_id = uuid.uuid4().hex[:12]
+        with self._locks.hold(schedule_id):
             now_iso = utc_now_iso()
             item = {
                 "id": schedule_id,
@@ -170,67 +291,124 @@ class ScheduleStore:
                 "last_dispatched_at": None,
                 "deleted_at": None,
             }
-            self._schedule_path(schedule_id).write_text(
-                json.dumps(item, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            self._write_item(schedule_id, item)
             return item
 
-    def list_schedules(self, include_disabled: bool = True) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
-        for path in sorted(self.schedules_dir.glob("*.json")):
-            if path.name.endswith(".runs.json"):
-                continue
-            if path.name.endswith(".runs.jsonl"):
-                continue
+    def _write_item(self, schedule_id: str, item: dict[str, Any]) -> None:
+        path = self._schedule_path(schedule_id)
+        atomic_write_json(path, item)
+        st = path.stat()
+        with self._cache_lock:
+            self._cache[path.name] = ((st.st_mtime_ns, st.st_size, st.st_ino), dict(item))
+            self._cache_version += 1
+
+    def _read_item(self, path: Path) -> dict[str, Any] | None:
+        try:
+            st = path.stat()
+        except OSError:
+            self._drop_cached(path.name)
+            return None
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._cache_lock:
+            cached = self._cache.get(path.name)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        try:
+            item = json.loads(path.read_bytes())
+        except Exception:
+            self._drop_cached(path.name)
+            raise
+        with self._cache_lock:
+            self._cache[path.name] = (key, item)
+            self._cache_version += 1
+        return dict(item)
+
+    def _drop_cached(self, name: str) -> None:
+        with self._cache_lock:
+            if self._cache.pop(name, None) is not None:
+                self._cache_version += 1
+
+    def _refresh(self) -> list[str]:
+        """Sync the cache with the schedules directory; return the schedule file names, sorted."""
+        names: list[str] = []
+        with os.scandir(self.schedules_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and not entry.name.endswith(".runs.json"):
+                    names.append(entry.name)
+        names.sort()
+        with self._cache_lock:
+            stale = self._cache.keys() - set(names)
+            for name in stale:
+                del self._cache[name]
+            if stale:
+                self._cache_version += 1
+        for name in names:
             try:
-                item = json.loads(path.read_text(encoding="utf-8"))
+                self._read_item(self.schedules_dir / name)
             except Exception:
                 continue
+        return names
+
+    def list_schedules(self, include_disabled: bool = True) -> list[dict[str, Any]]:
+        items: list[dict[str, Any]] = []
+        names = self._refresh()
+        with self._cache_lock:
+            cached = [self._cache[name][1] for name in names if name in self._cache]
+        for item in cached:
             if not include_disabled and not bool(item.get("enabled", True)):
                 continue
             if item.get("deleted_at"):
                 continue
-            items.append(item)
+            items.append(dict(item))
         items.sort(key=lambda x: (x.get("updated_at", ""), x.get("created_at", "")), reverse=True)
         return items
 
     def get_schedule(self, schedule_id: str) -> dict[str, Any]:
-        path = self._schedule_path(schedule_id)
-        if not path.exists():
+        item = self._read_item(self._schedule_path(schedule_id))
+        if item is None:
             raise FileNotFoundError(schedule_id)
-        item = json.loads(path.read_text(encoding="utf-8"))
         if item.get("deleted_at"):
             raise FileNotFoundError(schedule_id)
         return item
 
     def update_schedule(self, schedule_id: str, updates: dict[str, Any]) -> dict[str, Any]:
-        with self._lock:
+        with self._locks.hold(schedule_id):
             item = self.get_schedule(schedule_id)
             for key, value in updates.items():
                 item[key] = value
             item["updated_at"] = utc_now_iso()
-            self._schedule_path(schedule_id).write_text(
-                json.dumps(item, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            self._write_item(schedule_id, item)
             return item
 
     def delete_schedule(self, schedule_id: str) -> dict[str, Any]:
-        with self._lock:
+        with self._locks.hold(schedule_id):
             item = self.get_schedule(schedule_id)
             item["enabled"] = False
             item["deleted_at"] = utc_now_iso()
             item["updated_at"] = item["deleted_at"]
-            self._schedule_path(schedule_id).write_text(
-                json.dumps(item, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            self._write_item(schedule_id, item)
             return item
 
     def list_due_schedules(self, now_utc: datetime, limit: int = 20) -> list[dict[str, Any]]:
+        """Return up to `limit` enabled schedules whose next_run_at has passed, earliest first."""
+        self._refresh()
         due: list[dict[str, Any]] = []
-        for item in self.list_schedules(include_disabled=False):
+        with self._cache_lock:
+            if self._due_index_version != self._cache_version:
+                self._due_index = self._build_due_index()
+                self._due_index_version = self._cache_version
+            # The index is ordered by due time, so the scan stops at the first future entry.
+            for due_time, name in self._due_index:
+                if due_time > now_utc or len(due) >= limit:
+                    break
+                due.append(dict(self._cache[name][1]))
+        return due
+
+    def _build_due_index(self) -> list[tuple[datetime, str]]:
+        index: list[tuple[datetime, str]] = []
+        for name, (_, item) in self._cache.items():
+            if not bool(item.get("enabled", True)) or item.get("deleted_at"):
+                continue
             next_run_at = item.get("next_run_at")
             if not next_run_at:
                 continue
@@ -238,14 +416,12 @@ class ScheduleStore:
                 due_time = _parse_iso_datetime(next_run_at).astimezone(timezone.utc)
             except Exception:
                 continue
-            if due_time <= now_utc:
-                due.append(item)
-            if len(due) >= limit:
-                break
-        return due
+            index.append((due_time, name))
+        index.sort()
+        return index
 
     def mark_dispatched(self, schedule_id: str, now_utc: datetime) -> dict[str, Any]:
-        with self._lock:
+        with self._locks.hold(schedule_id):
             item = self.get_schedule(schedule_id)
             now_iso = now_utc.astimezone(timezone.utc).isoformat()
             item["last_dispatched_at"] = now_iso
@@ -261,10 +437,7 @@ class ScheduleStore:
                 )
                 item["next_run_at"] = next_run_at
             item["updated_at"] = utc_now_iso()
-            self._schedule_path(schedule_id).write_text(
-                json.dumps(item, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            self._write_item(schedule_id, item)
             return item
 
     def append_schedule_run(self, schedule_id: str, run_id: str, status: str = "queued") -> dict[str, Any]:
@@ -275,17 +448,17 @@ class ScheduleStore:
             "status": status,
             "created_at": utc_now_iso(),
         }
-        path = self._runs_path(schedule_id)
-        with path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        data = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        self._runs_handles.append(self._runs_path(schedule_id), data)
         return row
 
     def read_schedule_runs(self, schedule_id: str, limit: int = 100) -> list[dict[str, Any]]:
         path = self._runs_path(schedule_id)
-        if not path.exists():
+        if not path.exists() or limit <= 0:
             return []
+        # Rows are appended in creation order, so the newest ones are at the end of the file.
         rows: list[dict[str, Any]] = []
-        for line in path.read_text(encoding="utf-8").splitlines():
+        for line in _iter_lines_reversed(path):
             text = line.strip()
             if not text:
                 continue
@@ -293,5 +466,6 @@ class ScheduleStore:
                 rows.append(json.loads(text))
             except Exception:
                 continue
-        rows.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return rows[:limit]
+            if len(rows) >= limit:
+                break
+        return rows
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 import json
-import threading
+import os
 import uuid
 from pathlib import Path
 from typing import Any
 
-from softnix_agentic_agent.types import utc_now_iso
+from softnix_agentic_agent.storage.fileio import AppendHandleCache, atomic_write_json
+from softnix_agentic_agent.storage.locks import KeyedLocks
+from softnix_agentic_agent.types import utc_now_iso, utc_now_iso_cached
+
+_MAX_EVENT_HANDLES = 32
 
 
 class SkillBuildStore:
     def __init__(self, builds_dir: Path) -> None:
         self.builds_dir = builds_dir
         self.builds_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.Lock()
+        self._locks = KeyedLocks()
+        self._event_handles = AppendHandleCache(_MAX_EVENT_HANDLES)
+
+    def close(self) -> None:
+        self._event_handles.close()
 
     def build_dir(self, job_id: str) -> Path:
         return self.builds_dir / job_id
@@ -28,8 +36,8 @@ class SkillBuildStore:
         return self.build_dir(job_id) / "staging"
 
     def create_job(self, payload: dict[str, Any]) -> dict[str, Any]:
-        with self._lock:
-            job_id = uuid.uuid4().hex[:12]
+        job_id = uuid.uuid4().hex[:12]
+        with self._locks.hold(job_id):
             now = utc_now_iso()
             item = {
                 "id": job_id,
@@ -50,7 +58,7 @@ class SkillBuildStore:
             }
             build_dir = self.build_dir(job_id)
             build_dir.mkdir(parents=True, exist_ok=True)
-            self.state_path(job_id).write_text(json.dumps(item, ensure_ascii=False, indent=2), encoding="utf-8")
+            atomic_write_json(self.state_path(job_id), item)
             self.events_path(job_id).write_text("", encoding="utf-8")
             return item
 
@@ -58,24 +66,24 @@ class SkillBuildStore:
         path = self.state_path(job_id)
         if not path.exists():
             raise FileNotFoundError(job_id)
-        return json.loads(path.read_text(encoding="utf-8"))
+        return json.loads(path.read_bytes())
 
     def update_job(self, job_id: str, updates: dict[str, Any]) -> dict[str, Any]:
-        with self._lock:
+        with self._locks.hold(job_id):
             item = self.get_job(job_id)
             for key, value in updates.items():
                 item[key] = value
             item["updated_at"] = utc_now_iso()
             if item.get("status") in {"completed", "failed"} and not item.get("completed_at"):
                 item["completed_at"] = item["updated_at"]
-            self.state_path(job_id).write_text(json.dumps(item, ensure_ascii=False, indent=2), encoding="utf-8")
-            return item
+            atomic_write_json(self.state_path(job_id), item)
+        if item.get("status") in {"completed", "failed"}:
+            self._event_handles.discard(self.events_path(job_id))
+        return item
 
     def append_event(self, job_id: str, message: str) -> None:
-        path = self.events_path(job_id)
-        line = f"{utc_now_iso()} {message}\n"
-        with path.open("a", encoding="utf-8") as f:
-            f.write(line)
+        data = f"{utc_now_iso_cached()} {message}\n".encode("utf-8")
+        self._event_handles.append(self.events_path(job_id), data)
 
     def read_events(self, job_id: str) -> list[str]:
         path = self.events_path(job_id)
@@ -84,11 +92,32 @@ class SkillBuildStore:
         return [line.rstrip("\n") for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
 
     def list_jobs(self, limit: int = 100) -> list[dict[str, Any]]:
+        cap = max(1, int(limit))
+        # state.json is rewritten on every update, so its mtime orders jobs like updated_at does;
+        # only the newest `cap` files need to be parsed.
+        candidates: list[tuple[int, str]] = []
+        try:
+            it = os.scandir(self.builds_dir)
+        except FileNotFoundError:
+            # Retention or a manual cleanup may remove the whole builds directory.
+            return []
+        with it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                state_path = os.path.join(entry.path, "state.json")
+                try:
+                    candidates.append((os.stat(state_path).st_mtime_ns, state_path))
+                except OSError:
+                    continue
+        candidates.sort(reverse=True)
         rows: list[dict[str, Any]] = []
-        for path in sorted(self.builds_dir.glob("*/state.json")):
+        for _, state_path in candidates:
             try:
-                rows.append(json.loads(path.read_text(encoding="utf-8")))
+                rows.append(json.loads(Path(state_path).read_bytes()))
             except Exception:
                 continue
+            if len(rows) >= cap:
+                break
         rows.sort(key=lambda x: str(x.get("updated_at", "")), reverse=True)
-        return rows[: max(1, int(limit))]
+        return rows
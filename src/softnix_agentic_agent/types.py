@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
+import time
 from typing import Any
 
 
@@ -10,6 +11,22 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+# granularity_ms -> (bucket, iso); one slot per granularity so callers never evict each other.
+_cached_now_iso: dict[int, tuple[int, str]] = {}
+
+
+def utc_now_iso_cached(granularity_ms: int = 100) -> str:
+    """Like utc_now_iso, but reuses one string per `granularity_ms` bucket for bursty writers."""
+    granularity_ms = max(1, granularity_ms)
+    bucket = time.monotonic_ns() // (granularity_ms * 1_000_000)
+    cached_bucket, cached = _cached_now_iso.get(granularity_ms, (-1, ""))
+    if bucket == cached_bucket:
+        return cached
+    cached = utc_now_iso()
+    _cached_now_iso[granularity_ms] = (bucket, cached)
+    return cached
+
+
 class StopReason(str, Enum):
     COMPLETED = "completed"
     MAX_ITERS = "max_iters"
@@ -26,7 +43,7 @@ class RunStatus(str, Enum):
     CANCELED = "canceled"
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     content: str
     raw: dict[str, Any] = field(default_factory=dict)
@@ -39,7 +56,7 @@ class ProviderStatus:
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionResult:
     name: str
     ok: bool
@@ -47,7 +64,7 @@ class ActionResult:
     error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class IterationRecord:
     run_id: str
     iteration: int
@@ -61,8 +78,23 @@ class IterationRecord:
     error: str | None = None
     token_usage: dict[str, int] = field(default_factory=dict)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "iteration": self.iteration,
+            "timestamp": self.timestamp,
+            "prompt": self.prompt,
+            "plan": self.plan,
+            "actions": self.actions,
+            "action_results": self.action_results,
+            "output": self.output,
+            "done": self.done,
+            "error": self.error,
+            "token_usage": self.token_usage,
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class RunState:
     run_id: str
     task: str
@@ -3,6 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 import re
 
+_TOKEN_RE = re.compile(r"[A-Za-z0-9ก-๙_-]{4,}")
+_HINT_STOPWORDS = frozenset({"http", "https", "www", "news", "summary", "สรุป"})
+
 
 @dataclass
 class FallbackDecision:
@@ -31,7 +34,6 @@ def decide_web_fallback(
 ) -> FallbackDecision:
     text = (extracted_text or "").strip()
     reasons: list[str] = []
-    matched: list[str] = []
 
     if len(text) < int(min_chars):
         reasons.append(f"content_too_short:{len(text)}<{int(min_chars)}")
@@ -41,9 +43,8 @@ def decide_web_fallback(
         candidates.extend([x.strip() for x in required_keywords if x.strip()])
     else:
         # Infer coarse keyword candidates from task hint for lightweight gating.
-        for tok in re.findall(r"[A-Za-z0-9ก-๙_-]{4,}", task_hint or ""):
-            low = tok.lower()
-            if low in {"http", "https", "www", "news", "summary", "สรุป"}:
+        for tok in _TOKEN_RE.findall(task_hint or ""):
+            if tok.lower() in _HINT_STOPWORDS:
                 continue
             candidates.append(tok)
 
@@ -59,9 +60,7 @@ def decide_web_fallback(
             break
 
     low_text = text.lower()
-    for kw in uniq_keywords:
-        if kw.lower() in low_text:
-            matched.append(kw)
+    matched = [kw for kw in uniq_keywords if kw.lower() in low_text]
 
     if uniq_keywords and len(matched) == 0:
         reasons.append("required_keywords_missing")
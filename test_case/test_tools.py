@@ -1,39 +1,65 @@
 from pathlib import Path
+import subprocess
+from typing import Any
 
 import httpx
+import pytest
 
 from softnix_agentic_agent.agent.executor import SafeActionExecutor
 
+_SAFE_COMMANDS = ["echo", "ls", "python"]
 
-def _executor(tmp_path: Path) -> SafeActionExecutor:
-    return SafeActionExecutor(workspace=tmp_path, safe_commands=["echo", "ls", "python"])
 
+@pytest.fixture
+def executor(tmp_path: Path) -> SafeActionExecutor:
+    return SafeActionExecutor(workspace=tmp_path, safe_commands=_SAFE_COMMANDS)
 
-def test_list_dir_returns_entries(tmp_path: Path) -> None:
+
+class _FakeRun:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self.stdout = ""
+
+    def __call__(self, command: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        self.calls.append(list(command))
+        return subprocess.CompletedProcess(args=command, returncode=0, stdout=self.stdout, stderr="")
+
+
+@pytest.fixture
+def fake_subprocess(monkeypatch: pytest.MonkeyPatch) -> _FakeRun:
+    fake = _FakeRun()
+    monkeypatch.setattr(subprocess, "run", fake)
+    return fake
+
+
+@pytest.fixture(scope="module")
+def shared_executor(tmp_path_factory: pytest.TempPathFactory) -> SafeActionExecutor:
+    # For tests that never write to the workspace.
+    return SafeActionExecutor(workspace=tmp_path_factory.mktemp("tools"), safe_commands=_SAFE_COMMANDS)
+
+
+def test_list_dir_returns_entries(tmp_path: Path, executor: SafeActionExecutor) -> None:
     (tmp_path / "a.txt").write_text("A", encoding="utf-8")
     (tmp_path / "b.txt").write_text("B", encoding="utf-8")
 
-    ex = _executor(tmp_path)
-    result = ex.execute({"name": "list_dir", "params": {"path": "."}})
+    result = executor.execute({"name": "list_dir", "params": {"path": "."}})
 
     assert result.ok is True
     assert "a.txt" in result.output
     assert "b.txt" in result.output
 
 
-def test_read_file_returns_content(tmp_path: Path) -> None:
+def test_read_file_returns_content(tmp_path: Path, executor: SafeActionExecutor) -> None:
     (tmp_path / "note.txt").write_text("hello world", encoding="utf-8")
 
-    ex = _executor(tmp_path)
-    result = ex.execute({"name": "read_file", "params": {"path": "note.txt"}})
+    result = executor.execute({"name": "read_file", "params": {"path": "note.txt"}})
 
     assert result.ok is True
     assert result.output == "hello world"
 
 
-def test_write_workspace_file_creates_file(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-    result = ex.execute(
+def test_write_workspace_file_creates_file(tmp_path: Path, executor: SafeActionExecutor) -> None:
+    result = executor.execute(
         {
             "name": "write_workspace_file",
             "params": {"path": "out/index.html", "content": "<h1>Portfolio</h1>"},
@@ -44,16 +70,14 @@ def test_write_workspace_file_creates_file(tmp_path: Path) -> None:
     assert (tmp_path / "out" / "index.html").read_text(encoding="utf-8") == "<h1>Portfolio</h1>"
 
 
-def test_write_workspace_file_append_mode(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-
-    first = ex.execute(
+def test_write_workspace_file_append_mode(tmp_path: Path, executor: SafeActionExecutor) -> None:
+    first = executor.execute(
         {
             "name": "write_workspace_file",
             "params": {"path": "out/log.txt", "content": "line1\n"},
         }
     )
-    second = ex.execute(
+    second = executor.execute(
         {
             "name": "write_workspace_file",
             "params": {"path": "out/log.txt", "content": "line2\n", "mode": "append"},
@@ -65,9 +89,9 @@ def test_write_workspace_file_append_mode(tmp_path: Path) -> None:
     assert (tmp_path / "out" / "log.txt").read_text(encoding="utf-8") == "line1\nline2\n"
 
 
-def test_run_safe_command_success(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-    result = ex.execute(
+def test_run_safe_command_success(shared_executor: SafeActionExecutor, fake_subprocess: _FakeRun) -> None:
+    fake_subprocess.stdout = "hello-softnix\n"
+    result = shared_executor.execute(
         {
             "name": "run_safe_command",
             "params": {"command": "echo hello-softnix"},
@@ -76,11 +100,11 @@ def test_run_safe_command_success(tmp_path: Path) -> None:
 
     assert result.ok is True
     assert "hello-softnix" in result.output
+    assert fake_subprocess.calls == [["echo", "hello-softnix"]]
 
 
-def test_run_safe_command_rejects_non_allowlisted(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-    result = ex.execute(
+def test_run_safe_command_rejects_non_allowlisted(shared_executor: SafeActionExecutor) -> None:
+    result = shared_executor.execute(
         {
             "name": "run_safe_command",
             "params": {"command": "cat /etc/hosts"},
@@ -91,9 +115,8 @@ def test_run_safe_command_rejects_non_allowlisted(tmp_path: Path) -> None:
     assert "allowlisted" in (result.error or "")
 
 
-def test_run_shell_command_alias_success(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-    result = ex.execute(
+def test_run_shell_command_alias_success(shared_executor: SafeActionExecutor) -> None:
+    result = shared_executor.execute(
         {
             "name": "run_shell_command",
             "params": {"command": "echo alias-ok"},
@@ -103,9 +126,9 @@ def test_run_shell_command_alias_success(tmp_path: Path) -> None:
     assert "alias-ok" in result.output
 
 
-def test_run_python_code_success(tmp_path: Path) -> None:
-    ex = _executor(tmp_path)
-    result = ex.execute(
+def test_run_python_code_success(executor: SafeActionExecutor, fake_subprocess: _FakeRun) -> None:
+    fake_subprocess.stdout = "hello-python\n"
+    result = executor.execute(
         {
             "name": "run_python_code",
             "params": {"code": "print('hello-python')"},
@@ -113,9 +136,12 @@ def test_run_python_code_success(tmp_path: Path) -> None:
     )
     assert result.ok is True
     assert "hello-python" in result.output
+    assert len(fake_subprocess.calls) == 1
+    assert fake_subprocess.calls[0][0] == "python"
+    assert fake_subprocess.calls[0][1].endswith(".py")
 
 
-def test_web_fetch_success(tmp_path: Path, monkeypatch) -> None:
+def test_web_fetch_success(monkeypatch, shared_executor: SafeActionExecutor) -> None:
     class _Resp:
         status_code = 200
         headers = {"content-type": "text/plain"}
@@ -130,8 +156,7 @@ def test_web_fetch_success(tmp_path: Path, monkeypatch) -> None:
         return _Resp()
 
     monkeypatch.setattr(httpx, "get", _fake_get)
-    ex = _executor(tmp_path)
-    result = ex.execute({"name": "web_fetch", "params": {"url": "https://example.com/data"}})
+    result = shared_executor.execute({"name": "web_fetch", "params": {"url": "https://example.com/data"}})
     assert result.ok is True
     assert "status=200" in result.output
     assert "hello from web" in result.output
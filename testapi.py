@@ -2,134 +2,182 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 import json
 import sys
 import time
-import urllib.error
-import urllib.request
+from typing import Callable
+
+import httpx
+
+# One keep-alive pool for the whole run, so the checks share a connection instead of reconnecting each time.
+_CLIENT = httpx.Client(limits=httpx.Limits(max_connections=8, max_keepalive_connections=4))
+atexit.register(_CLIENT.close)
+
+
+def _request_bytes(
+    method: str,
+    url: str,
+    body: bytes | None = None,
+    content_type: str = "application/json",
+    timeout: float = 15.0,
+):
+    headers = {"Content-Type": content_type} if body is not None else None
+    resp = _CLIENT.request(method, url, content=body, headers=headers, timeout=timeout)
+    return resp.status_code, resp.text
 
 
 def _request(method: str, url: str, payload: dict | None = None, timeout: float = 15.0):
-    data = None
-    headers = {}
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-        headers["Content-Type"] = "application/json"
+    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+    return _request_bytes(method, url, body, timeout=timeout)
 
-    req = urllib.request.Request(url=url, data=data, headers=headers, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read().decode("utf-8")
-            status = resp.getcode()
-            return status, body
-    except urllib.error.HTTPError as exc:
-        body = exc.read().decode("utf-8") if exc.fp else ""
-        return exc.code, body
 
+def _request_status(method: str, url: str, timeout: float = 15.0) -> int:
+    # The body is still drained so the connection goes back to the pool, but it is never decoded.
+    with _CLIENT.stream(method, url, timeout=timeout) as resp:
+        for _ in resp.iter_raw():
+            pass
+        return resp.status_code
 
-def _expect(condition: bool, message: str) -> None:
+
+def _expect(condition: bool, message: str | Callable[[], str]) -> None:
+    # Pass a lambda for messages that embed a response body; it is only formatted on failure.
     if not condition:
-        raise AssertionError(message)
+        raise AssertionError(message() if callable(message) else message)
 
 
 def _json(body: str) -> dict:
     return json.loads(body) if body.strip() else {}
 
 
+def _warm(base_url: str) -> None:
+    """Open the pooled connection and touch the server's routing before the timed checks."""
+    try:
+        _request_status("GET", f"{base_url}/runs/not_found_run_id")
+    except httpx.HTTPError:
+        pass
+
+
 def run_tests(base_url: str, provider: str, model: str, workspace: str, skills_dir: str) -> int:
-    failures = 0
+    results: list[tuple[str, str | None]] = []
 
-    def check(name: str, fn):
-        nonlocal failures
+    def check(fn) -> str | None:
         try:
             fn()
-            print(f"[PASS] {name}")
+            return None
         except Exception as exc:
-            failures += 1
-            print(f"[FAIL] {name}: {exc}")
+            return str(exc)
 
     state = {"run_id": None}
+    create_body = json.dumps(
+        {
+            "task": "API feature test: create a small HTML file",
+            "provider": provider,
+            "model": model,
+            "max_iters": 2,
+            "workspace": workspace,
+            "skills_dir": skills_dir,
+        }
+    ).encode("utf-8")
 
     def test_create_run() -> None:
-        status, body = _request(
-            "POST",
-            f"{base_url}/runs",
-            {
-                "task": "API feature test: create a small HTML file",
-                "provider": provider,
-                "model": model,
-                "max_iters": 2,
-                "workspace": workspace,
-                "skills_dir": skills_dir,
-            },
-        )
-        _expect(status == 200, f"expected 200, got {status}, body={body}")
+        status, body = _request_bytes("POST", f"{base_url}/runs", create_body)
+        _expect(status == 200, lambda: f"expected 200, got {status}, body={body}")
         data = _json(body)
-        _expect("run_id" in data, f"missing run_id in response: {body}")
+        _expect("run_id" in data, lambda: f"missing run_id in response: {body}")
         state["run_id"] = data["run_id"]
 
     def test_get_run() -> None:
         run_id = state["run_id"]
         _expect(run_id is not None, "run_id is None")
-        time.sleep(1)
-        status, body = _request("GET", f"{base_url}/runs/{run_id}")
-        _expect(status == 200, f"expected 200, got {status}, body={body}")
-        data = _json(body)
-        _expect(data.get("run_id") == run_id, f"run_id mismatch: {body}")
-        _expect("status" in data, f"missing status in: {body}")
-        _expect("stop_reason" in data, f"missing stop_reason in: {body}")
+        deadline = time.monotonic() + 5.0
+        delay = 0.02
+        while True:
+            status, body = _request("GET", f"{base_url}/runs/{run_id}")
+            data = _json(body) if status == 200 else {}
+            if data.get("status") or time.monotonic() >= deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        _expect(status == 200, lambda: f"expected 200, got {status}, body={body}")
+        _expect(data.get("run_id") == run_id, lambda: f"run_id mismatch: {body}")
+        _expect("status" in data, lambda: f"missing status in: {body}")
+        _expect("stop_reason" in data, lambda: f"missing stop_reason in: {body}")
 
     def test_get_iterations() -> None:
         run_id = state["run_id"]
         _expect(run_id is not None, "run_id is None")
         status, body = _request("GET", f"{base_url}/runs/{run_id}/iterations")
-        _expect(status == 200, f"expected 200, got {status}, body={body}")
+        _expect(status == 200, lambda: f"expected 200, got {status}, body={body}")
         data = _json(body)
-        _expect("items" in data, f"missing items in: {body}")
-        _expect(isinstance(data["items"], list), f"items is not list: {body}")
+        _expect("items" in data, lambda: f"missing items in: {body}")
+        _expect(isinstance(data["items"], list), lambda: f"items is not list: {body}")
 
     def test_cancel_run() -> None:
         run_id = state["run_id"]
         _expect(run_id is not None, "run_id is None")
         status, body = _request("POST", f"{base_url}/runs/{run_id}/cancel")
-        _expect(status == 200, f"expected 200, got {status}, body={body}")
-        data = _json(body)
-        _expect(data.get("status") == "cancel_requested", f"unexpected response: {body}")
+        _expect(status == 200, lambda: f"expected 200, got {status}, body={body}")
+        _expect(_json(body).get("status") == "cancel_requested", lambda: f"unexpected response: {body}")
 
     def test_get_missing_run() -> None:
-        status, body = _request("GET", f"{base_url}/runs/not_found_run_id")
-        _expect(status == 404, f"expected 404, got {status}, body={body}")
+        status = _request_status("GET", f"{base_url}/runs/not_found_run_id")
+        _expect(status == 404, f"expected 404, got {status}")
 
     def test_cancel_missing_run() -> None:
-        status, body = _request("POST", f"{base_url}/runs/not_found_run_id/cancel")
-        _expect(status == 404, f"expected 404, got {status}, body={body}")
-
-    check("POST /runs", test_create_run)
-    check("GET /runs/{id}", test_get_run)
-    check("GET /runs/{id}/iterations", test_get_iterations)
-    check("POST /runs/{id}/cancel", test_cancel_run)
-    check("GET /runs/{id} (404)", test_get_missing_run)
-    check("POST /runs/{id}/cancel (404)", test_cancel_missing_run)
-
-    print("\n=== Summary ===")
-    print(f"Base URL: {base_url}")
-    print(f"Run ID: {state['run_id']}")
-    print(f"Failures: {failures}")
+        status = _request_status("POST", f"{base_url}/runs/not_found_run_id/cancel")
+        _expect(status == 404, f"expected 404, got {status}")
+
+    sequential = [
+        ("POST /runs", test_create_run),
+        ("GET /runs/{id}", test_get_run),
+        ("GET /runs/{id}/iterations", test_get_iterations),
+        ("POST /runs/{id}/cancel", test_cancel_run),
+    ]
+    independent = [
+        ("GET /runs/{id} (404)", test_get_missing_run),
+        ("POST /runs/{id}/cancel (404)", test_cancel_missing_run),
+    ]
+    # The 404 checks do not depend on the created run, so they run while the chain waits on the server.
+    with ThreadPoolExecutor(max_workers=len(independent)) as pool:
+        pending = [(name, pool.submit(check, fn)) for name, fn in independent]
+        for name, fn in sequential:
+            results.append((name, check(fn)))
+        for name, future in pending:
+            results.append((name, future.result()))
+
+    failures = sum(1 for _, error in results if error is not None)
+    lines = [f"[PASS] {name}" if error is None else f"[FAIL] {name}: {error}" for name, error in results]
+    lines += [
+        "",
+        "=== Summary ===",
+        f"Base URL: {base_url}",
+        f"Run ID: {state['run_id']}",
+        f"Failures: {failures}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
     return 1 if failures else 0
 
 
-def main() -> int:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Softnix API feature test")
     parser.add_argument("--base-url", default="http://127.0.0.1:8787")
     parser.add_argument("--provider", default="claude")
     parser.add_argument("--model", default="claude-haiku-4-5")
     parser.add_argument("--workspace", default="./tmp")
     parser.add_argument("--skills-dir", default="skillpacks")
-    args = parser.parse_args()
+    parser.add_argument("--warm", action="store_true", help="prime the connection and server before testing")
+    return parser
 
+
+def run_tests_from_args(args: argparse.Namespace) -> int:
+    base_url = args.base_url.rstrip("/")
+    if getattr(args, "warm", False):
+        _warm(base_url)
     return run_tests(
-        base_url=args.base_url.rstrip("/"),
+        base_url=base_url,
         provider=args.provider,
         model=args.model,
         workspace=args.workspace,
@@ -137,5 +185,9 @@ def main() -> int:
     )
 
 
+def main() -> int:
+    return run_tests_from_args(_build_parser().parse_args())
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,35 @@
+from typing import Any, Callable
+
+from fastapi.testclient import TestClient
+import pytest
+
+from softnix_agentic_agent.api import app as app_module
+from softnix_agentic_agent.config import Settings
+from softnix_agentic_agent.storage.filesystem_store import FilesystemStore
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    # Handlers read the app module's globals on every request, so one client serves every
+    # test's monkeypatched state. It is deliberately not entered as a context manager: that
+    # would run the startup hooks and could launch the scheduler/retention threads from .env.
+    return TestClient(app_module.app)
+
+
+@pytest.fixture
+def install_app_state(monkeypatch: pytest.MonkeyPatch) -> Callable[..., None]:
+    """Bind per-test app state; extra keyword arguments override other app module attributes."""
+
+    def install(settings: Settings, store: FilesystemStore, **overrides: Any) -> None:
+        attrs = {
+            "_settings": settings,
+            "_store": store,
+            "_threads": {},
+            "_telegram_gateway": None,
+            "_memory_admin": None,
+            **overrides,
+        }
+        for name, value in attrs.items():
+            monkeypatch.setattr(app_module, name, value)
+
+    return install
@@ -2,16 +2,37 @@ from pathlib import Path
 import base64
 import re
 import time
+from typing import NamedTuple
 
 from fastapi.testclient import TestClient
+import pytest
 
+from softnix_agentic_agent.api import app as app_module
 from softnix_agentic_agent.config import Settings
 from softnix_agentic_agent.storage.filesystem_store import FilesystemStore
 from softnix_agentic_agent.storage.retention_service import RetentionConfig, RunRetentionService
-from softnix_agentic_agent.types import RunState
+from softnix_agentic_agent.storage.skill_build_store import SkillBuildStore
+from softnix_agentic_agent.types import RunState, RunStatus
+
+
+# skills_dir is per-test (tmp_path); the rest of the POST /runs body is fixed.
+_CREATE_RUN_PAYLOAD = {"task": "t", "provider": "openai", "max_iters": 2, "workspace": "/other/path"}
+_SSE_ID_RE = re.compile(rb"^id:\s*(\d+)", re.M)
+_SESSION_PENDING_VERBOSITY = (
+    b"# SESSION\n\n## Context\n"
+    b"- key:memory.pending.response.verbosity | value:concise | kind:preference | priority:45 | ttl:session_end | source:user_inferred | updated_at:2026-02-07T00:00:00Z\n"
+)
+_SESSION_PENDING_TONE = (
+    b"# SESSION\n\n## Context\n"
+    b"- key:memory.pending.response.tone | value:friendly | kind:preference | priority:45 | ttl:session_end | source:user_inferred | updated_at:2026-02-07T00:00:00Z\n"
+)
+_PDF_B64 = base64.b64encode(b"%PDF-1.4\nhello").decode("ascii")
+_EVIL_B64 = base64.b64encode(b"x").decode("ascii")
 
 
 class FakeRunner:
+    __slots__ = ("store", "workspace")
+
     def __init__(self, store: FilesystemStore, workspace: Path) -> None:
         self.store = store
         self.workspace = workspace
@@ -27,8 +48,7 @@ class FakeRunner:
             max_iters=max_iters,
         )
         self.store.init_run(state)
-        artifacts_dir = self.store.run_dir(state.run_id) / "artifacts"
-        (artifacts_dir / "report.txt").write_text("ok", encoding="utf-8")
+        (self.store.run_dir(state.run_id) / "artifacts" / "report.txt").write_bytes(b"ok")
         return state
 
     def execute_prepared_run(self, run_id: str):  # type: ignore[no-untyped-def]
@@ -45,39 +65,45 @@ class FakeRunner:
         return s
 
 
-def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
+class _PreparedRun(NamedTuple):
+    run_id: str
+    settings: Settings
+    store: FilesystemStore
+    tmp_path: Path
+
 
+@pytest.fixture
+def prepared_run(client: TestClient, install_app_state, tmp_path: Path) -> _PreparedRun:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path, memory_admin_key="admin-secret")
     store = FilesystemStore(settings.runs_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
     def fake_build_runner(settings, provider_name, model=None):  # type: ignore[no-untyped-def]
         return FakeRunner(store=store, workspace=tmp_path)
 
-    monkeypatch.setattr(app_module, "build_runner", fake_build_runner)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, build_runner=fake_build_runner)
 
     r = client.post(
         "/runs",
-        json={"task": "t", "provider": "openai", "max_iters": 2, "workspace": "/other/path", "skills_dir": str(tmp_path)},
+        json={**_CREATE_RUN_PAYLOAD, "skills_dir": str(tmp_path)},
     )
     assert r.status_code == 200
-    run_id = r.json()["run_id"]
-    assert r.json()["workspace"] == str(tmp_path)
+    body = r.json()
+    run_id = body["run_id"]
+    assert body["workspace"] == str(tmp_path)
     store.log_event(run_id, "skills selected iteration=1 names=web-summary,sample-skill")
+    return _PreparedRun(run_id=run_id, settings=settings, store=store, tmp_path=tmp_path)
+
+
+def test_api_create_get_cancel(client: TestClient, prepared_run: _PreparedRun) -> None:
+    run_id = prepared_run.run_id
+    tmp_path = prepared_run.tmp_path
 
     r2 = client.get(f"/runs/{run_id}")
     assert r2.status_code == 200
-    assert r2.json()["run_id"] == run_id
-    assert r2.json()["workspace"] == str(tmp_path)
-    assert r2.json().get("selected_skills") == ["web-summary", "sample-skill"]
+    body = r2.json()
+    assert body["run_id"] == run_id
+    assert body["workspace"] == str(tmp_path)
+    assert body.get("selected_skills") == ["web-summary", "sample-skill"]
     assert r2.headers.get("x-content-type-options") == "nosniff"
     assert r2.headers.get("x-frame-options") == "DENY"
 
@@ -88,25 +114,50 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
     r_stream = client.get(f"/runs/{run_id}/stream?poll_ms=100&max_events=3")
     assert r_stream.status_code == 200
     assert r_stream.headers["content-type"].startswith("text/event-stream")
-    assert "event: state" in r_stream.text or "event: iteration" in r_stream.text
-    ids = [int(x) for x in re.findall(r"id:\\s*(\\d+)", r_stream.text)]
+    stream_body = r_stream.content
+    assert b"event: state" in stream_body or b"event: iteration" in stream_body
+    ids = [int(x) for x in _SSE_ID_RE.findall(stream_body)]
     if ids:
         last_id = max(ids)
-        r_stream_resume = client.get(f"/runs/{run_id}/stream?poll_ms=100&max_events=3&last_event_id={last_id}")
+        r_stream_resume = client.get(f"/runs/{run_id}/stream?poll_ms=100&max_events=1&last_event_id={last_id}")
         assert r_stream_resume.status_code == 200
-        resume_ids = [int(x) for x in re.findall(r"id:\\s*(\\d+)", r_stream_resume.text)]
+        resume_ids = [int(x) for x in _SSE_ID_RE.findall(r_stream_resume.content)]
         assert all(x > last_id for x in resume_ids)
 
     r_events = client.get(f"/runs/{run_id}/events")
     assert r_events.status_code == 200
     assert isinstance(r_events.json()["items"], list)
 
-    (tmp_path / "memory" / "SESSION.md").parent.mkdir(parents=True, exist_ok=True)
-    (tmp_path / "memory" / "SESSION.md").write_text(
-        "# SESSION\n\n## Context\n"
-        "- key:memory.pending.response.verbosity | value:concise | kind:preference | priority:45 | ttl:session_end | source:user_inferred | updated_at:2026-02-07T00:00:00Z\n",
-        encoding="utf-8",
-    )
+    r_runs = client.get("/runs")
+    assert r_runs.status_code == 200
+    body = r_runs.json()
+    assert len(body["items"]) >= 1
+    assert body["items"][0].get("selected_skills") == ["web-summary", "sample-skill"]
+
+    r_resume = client.post(f"/runs/{run_id}/resume")
+    assert r_resume.status_code == 200
+    assert r_resume.json()["status"] == "resumed"
+
+    r4 = client.post(f"/runs/{run_id}/cancel")
+    assert r4.status_code == 200
+    assert r4.json()["status"] == "cancel_requested"
+
+
+def test_api_stream_ends_once_max_events_is_reached(client: TestClient, prepared_run: _PreparedRun) -> None:
+    started = time.monotonic()
+    r_stream = client.get(f"/runs/{prepared_run.run_id}/stream?poll_ms=5000&max_events=1")
+    assert r_stream.status_code == 200
+    assert b"event: state" in r_stream.content
+    # The cap is met in the first poll round, so the response must not wait out poll_ms.
+    assert time.monotonic() - started < 2.5
+
+
+def test_api_run_memory_confirm_reject_and_policy_reload(client: TestClient, prepared_run: _PreparedRun) -> None:
+    run_id = prepared_run.run_id
+    session_path = prepared_run.tmp_path / "memory" / "SESSION.md"
+
+    session_path.parent.mkdir(parents=True, exist_ok=True)
+    session_path.write_bytes(_SESSION_PENDING_VERBOSITY)
     r_pending = client.get(f"/runs/{run_id}/memory/pending")
     assert r_pending.status_code == 200
     pending_items = r_pending.json()["items"]
@@ -115,8 +166,9 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
 
     r_metrics = client.get(f"/runs/{run_id}/memory/metrics")
     assert r_metrics.status_code == 200
-    assert r_metrics.json()["pending_count"] == 1
-    assert isinstance(r_metrics.json()["policy_allow_tools"], list)
+    body = r_metrics.json()
+    assert body["pending_count"] == 1
+    assert isinstance(body["policy_allow_tools"], list)
 
     r_confirm = client.post(
         f"/runs/{run_id}/memory/confirm",
@@ -129,11 +181,7 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
     assert r_pending_after_confirm.status_code == 200
     assert r_pending_after_confirm.json()["items"] == []
 
-    (tmp_path / "memory" / "SESSION.md").write_text(
-        "# SESSION\n\n## Context\n"
-        "- key:memory.pending.response.tone | value:friendly | kind:preference | priority:45 | ttl:session_end | source:user_inferred | updated_at:2026-02-07T00:00:00Z\n",
-        encoding="utf-8",
-    )
+    session_path.write_bytes(_SESSION_PENDING_TONE)
     r_reject = client.post(
         f"/runs/{run_id}/memory/reject",
         json={"key": "response.tone", "reason": "reject via api"},
@@ -146,21 +194,14 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
 
     r_reload = client.post("/admin/memory/policy/reload", headers={"x-memory-admin-key": "admin-secret"})
     assert r_reload.status_code == 200
-    assert r_reload.json()["status"] == "reloaded"
-    assert "policy_allow_tools" in r_reload.json()
+    body = r_reload.json()
+    assert body["status"] == "reloaded"
+    assert "policy_allow_tools" in body
 
-    r_runs = client.get("/runs")
-    assert r_runs.status_code == 200
-    assert len(r_runs.json()["items"]) >= 1
-    assert r_runs.json()["items"][0].get("selected_skills") == ["web-summary", "sample-skill"]
 
-    r_resume = client.post(f"/runs/{run_id}/resume")
-    assert r_resume.status_code == 200
-    assert r_resume.json()["status"] == "resumed"
-
-    r4 = client.post(f"/runs/{run_id}/cancel")
-    assert r4.status_code == 200
-    assert r4.json()["status"] == "cancel_requested"
+def test_api_system_endpoints_and_artifacts(client: TestClient, prepared_run: _PreparedRun) -> None:
+    run_id = prepared_run.run_id
+    settings = prepared_run.settings
 
     r_skills = client.get("/skills")
     assert r_skills.status_code == 200
@@ -172,14 +213,16 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
 
     r_config = client.get("/system/config")
     assert r_config.status_code == 200
-    assert r_config.json()["workspace"] == str(tmp_path)
-    assert r_config.json()["skill_builds_dir"] == str(settings.skill_builds_dir)
-    assert r_config.json()["memory_admin_configured"] is True
+    body = r_config.json()
+    assert body["workspace"] == str(prepared_run.tmp_path)
+    assert body["skill_builds_dir"] == str(settings.skill_builds_dir)
+    assert body["memory_admin_configured"] is True
 
     r_artifacts = client.get(f"/artifacts/{run_id}")
     assert r_artifacts.status_code == 200
-    assert "report.txt" in r_artifacts.json()["items"]
-    assert any(entry["path"] == "report.txt" for entry in r_artifacts.json().get("entries", []))
+    body = r_artifacts.json()
+    assert "report.txt" in body["items"]
+    assert any(entry["path"] == "report.txt" for entry in body.get("entries", []))
 
     r_artifact_file = client.get(f"/artifacts/{run_id}/report.txt")
     assert r_artifact_file.status_code == 200
@@ -197,24 +240,14 @@ def test_api_create_get_cancel(monkeypatch, tmp_path: Path) -> None:
     assert cors_preflight.headers.get("access-control-allow-origin") == "http://127.0.0.1:5173"
 
 
-def test_api_requires_key_when_configured(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_api_requires_key_when_configured(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path, api_key="secret-key")
     store = FilesystemStore(settings.runs_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
     def fake_build_runner(settings, provider_name, model=None):  # type: ignore[no-untyped-def]
         return FakeRunner(store=store, workspace=tmp_path)
 
-    monkeypatch.setattr(app_module, "build_runner", fake_build_runner)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, build_runner=fake_build_runner)
 
     no_key = client.get("/runs")
     assert no_key.status_code == 401
@@ -239,10 +272,7 @@ def test_api_requires_key_when_configured(monkeypatch, tmp_path: Path) -> None:
     assert reload_policy.status_code == 403
 
 
-def test_admin_retention_report_and_run(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-    from softnix_agentic_agent.types import RunStatus
-
+def test_admin_retention_report_and_run(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(
         runs_dir=tmp_path / "runs",
         workspace=tmp_path,
@@ -282,13 +312,6 @@ def test_admin_retention_report_and_run(monkeypatch, tmp_path: Path) -> None:
     store.init_run(active)
     (store.run_dir("active") / "artifacts" / "active.txt").write_text("x", encoding="utf-8")
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-    monkeypatch.setattr(app_module, "_run_retention", None)
-
     retention = RunRetentionService(
         runs_dir=settings.runs_dir,
         config=RetentionConfig(
@@ -299,9 +322,7 @@ def test_admin_retention_report_and_run(monkeypatch, tmp_path: Path) -> None:
             max_bytes=settings.run_retention_max_bytes,
         ),
     )
-    monkeypatch.setattr(app_module, "_run_retention", retention)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, _run_retention=retention)
 
     no_key = client.get("/admin/storage/retention/report")
     assert no_key.status_code == 401
@@ -333,9 +354,7 @@ def test_admin_retention_report_and_run(monkeypatch, tmp_path: Path) -> None:
     assert (settings.runs_dir / "active").exists()
 
 
-def test_runs_are_sorted_by_latest_updated_at(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_runs_are_sorted_by_latest_updated_at(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path)
     store = FilesystemStore(settings.runs_dir)
 
@@ -364,13 +383,8 @@ def test_runs_are_sorted_by_latest_updated_at(monkeypatch, tmp_path: Path) -> No
     store.init_run(old_state)
     store.init_run(new_state)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
+    install_app_state(settings, store)
 
-    client = TestClient(app_module.app)
     resp = client.get("/runs")
     assert resp.status_code == 200
     items = resp.json()["items"]
@@ -378,9 +392,7 @@ def test_runs_are_sorted_by_latest_updated_at(monkeypatch, tmp_path: Path) -> No
     assert items[1]["run_id"] == "oldrun"
 
 
-def test_telegram_webhook_and_poll(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_telegram_webhook_and_poll(client: TestClient, install_app_state, tmp_path: Path) -> None:
     class FakeTelegramGateway:
         def __init__(self, settings, store, thread_registry):  # type: ignore[no-untyped-def]
             self.settings = settings
@@ -412,14 +424,7 @@ def test_telegram_webhook_and_poll(monkeypatch, tmp_path: Path) -> None:
     )
     store = FilesystemStore(settings.runs_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-    monkeypatch.setattr(app_module, "TelegramGateway", FakeTelegramGateway)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, TelegramGateway=FakeTelegramGateway)
 
     bad = client.post("/telegram/webhook", json={"message": {"text": "/help"}}, headers={})
     assert bad.status_code == 401
@@ -434,8 +439,9 @@ def test_telegram_webhook_and_poll(monkeypatch, tmp_path: Path) -> None:
 
     poll = client.post("/telegram/poll?limit=5")
     assert poll.status_code == 200
-    assert poll.json()["handled"] == 1
-    assert poll.json()["limit"] == 5
+    body = poll.json()
+    assert body["handled"] == 1
+    assert body["limit"] == 5
 
     metrics = client.get("/telegram/metrics")
     assert metrics.status_code == 200
@@ -445,9 +451,7 @@ def test_telegram_webhook_and_poll(monkeypatch, tmp_path: Path) -> None:
     assert len(audit.json()["items"]) == 1
 
 
-def test_memory_admin_key_control_plane_rotate_revoke_and_audit(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_memory_admin_key_control_plane_rotate_revoke_and_audit(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(
         runs_dir=tmp_path / "runs",
         workspace=tmp_path,
@@ -458,13 +462,7 @@ def test_memory_admin_key_control_plane_rotate_revoke_and_audit(monkeypatch, tmp
     )
     store = FilesystemStore(settings.runs_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store)
 
     keys_before = client.get("/admin/memory/keys", headers={"x-memory-admin-key": "legacy-admin"})
     assert keys_before.status_code == 200
@@ -504,37 +502,30 @@ def test_memory_admin_key_control_plane_rotate_revoke_and_audit(monkeypatch, tmp
     assert "revoke_key" in actions
 
 
-def test_upload_file_to_workspace(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_upload_file_to_workspace(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path)
     store = FilesystemStore(settings.runs_dir)
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store)
 
     upload = client.post(
         "/files/upload",
         json={
             "filename": "sample.pdf",
-            "content_base64": base64.b64encode(b"%PDF-1.4\nhello").decode("ascii"),
+            "content_base64": _PDF_B64,
             "path": "docs/input/sample.pdf",
         },
     )
     assert upload.status_code == 200
-    assert upload.json()["status"] == "uploaded"
-    assert upload.json()["path"] == "docs/input/sample.pdf"
+    body = upload.json()
+    assert body["status"] == "uploaded"
+    assert body["path"] == "docs/input/sample.pdf"
     assert (tmp_path / "docs" / "input" / "sample.pdf").exists()
 
     blocked = client.post(
         "/files/upload",
         json={
             "filename": "evil.pdf",
-            "content_base64": base64.b64encode(b"x").decode("ascii"),
+            "content_base64": _EVIL_B64,
             "path": "../evil.pdf",
         },
     )
@@ -542,10 +533,7 @@ def test_upload_file_to_workspace(monkeypatch, tmp_path: Path) -> None:
     assert "escapes workspace" in blocked.json()["detail"]
 
 
-def test_skill_build_api_create_and_track(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-    from softnix_agentic_agent.storage.skill_build_store import SkillBuildStore
-
+def test_skill_build_api_create_and_track(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(
         runs_dir=tmp_path / "runs",
         workspace=tmp_path,
@@ -554,15 +542,7 @@ def test_skill_build_api_create_and_track(monkeypatch, tmp_path: Path) -> None:
     )
     store = FilesystemStore(settings.runs_dir)
     skill_build_store = SkillBuildStore(settings.skill_builds_dir)
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_skill_build_store", skill_build_store)
-    monkeypatch.setattr(app_module, "_skill_build_service", None)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, _skill_build_store=skill_build_store, _skill_build_service=None)
 
     created = client.post(
         "/skills/build",
@@ -579,15 +559,12 @@ def test_skill_build_api_create_and_track(monkeypatch, tmp_path: Path) -> None:
     job_id = item["id"]
     assert item["status"] in {"queued", "running"}
 
-    last = item
-    for _ in range(80):
-        resp = client.get(f"/skills/builds/{job_id}")
-        assert resp.status_code == 200
-        last = resp.json()["item"]
-        if last["status"] in {"completed", "failed"}:
-            break
-        time.sleep(0.05)
+    # Wait on the build worker itself rather than polling the job endpoint.
+    assert app_module._skill_build_service.wait(job_id, timeout=5)
 
+    resp = client.get(f"/skills/builds/{job_id}")
+    assert resp.status_code == 200
+    last = resp.json()["item"]
     assert last["status"] == "completed"
     assert last["stage"] == "completed"
     assert last["skill_name"] == "order-status"
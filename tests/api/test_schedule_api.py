@@ -33,9 +33,7 @@ class FakeRunner:
         return s
 
 
-def test_schedule_crud_and_run_now(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_schedule_crud_and_run_now(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(
         runs_dir=tmp_path / "runs",
         workspace=tmp_path,
@@ -46,19 +44,10 @@ def test_schedule_crud_and_run_now(monkeypatch, tmp_path: Path) -> None:
     store = FilesystemStore(settings.runs_dir)
     schedule_store = ScheduleStore(settings.scheduler_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_schedule_store", schedule_store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
     def fake_build_runner(settings, provider_name, model=None):  # type: ignore[no-untyped-def]
         return FakeRunner(store=store, workspace=tmp_path)
 
-    monkeypatch.setattr(app_module, "build_runner", fake_build_runner)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, _schedule_store=schedule_store, build_runner=fake_build_runner)
 
     create_resp = client.post(
         "/schedules",
@@ -103,21 +92,12 @@ def test_schedule_crud_and_run_now(monkeypatch, tmp_path: Path) -> None:
     assert delete_resp.json()["status"] == "deleted"
 
 
-def test_schedule_create_validation(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_schedule_create_validation(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path, scheduler_dir=tmp_path / "schedules")
     store = FilesystemStore(settings.runs_dir)
     schedule_store = ScheduleStore(settings.scheduler_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_schedule_store", schedule_store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, _schedule_store=schedule_store)
 
     no_run_at = client.post(
         "/schedules",
@@ -132,21 +112,12 @@ def test_schedule_create_validation(monkeypatch, tmp_path: Path) -> None:
     assert bad_cron.status_code == 400
 
 
-def test_schedule_parse_and_create_from_text(monkeypatch, tmp_path: Path) -> None:
-    from softnix_agentic_agent.api import app as app_module
-
+def test_schedule_parse_and_create_from_text(client: TestClient, install_app_state, tmp_path: Path) -> None:
     settings = Settings(runs_dir=tmp_path / "runs", workspace=tmp_path, skills_dir=tmp_path, scheduler_dir=tmp_path / "schedules")
     store = FilesystemStore(settings.runs_dir)
     schedule_store = ScheduleStore(settings.scheduler_dir)
 
-    monkeypatch.setattr(app_module, "_settings", settings)
-    monkeypatch.setattr(app_module, "_store", store)
-    monkeypatch.setattr(app_module, "_schedule_store", schedule_store)
-    monkeypatch.setattr(app_module, "_threads", {})
-    monkeypatch.setattr(app_module, "_telegram_gateway", None)
-    monkeypatch.setattr(app_module, "_memory_admin", None)
-
-    client = TestClient(app_module.app)
+    install_app_state(settings, store, _schedule_store=schedule_store)
 
     parsed = client.post(
         "/schedules/parse",
@@ -40,6 +40,41 @@ def test_store_write_and_resume(tmp_path: Path) -> None:
     assert canceled.cancel_requested is True
 
 
+def test_append_iteration_roundtrips_record_fields(tmp_path: Path) -> None:
+    store = FilesystemStore(tmp_path)
+    state = RunState(
+        run_id="it1",
+        task="t",
+        provider="openai",
+        model="m",
+        workspace=str(tmp_path),
+        skills_dir=str(tmp_path),
+        max_iters=1,
+    )
+    store.init_run(state)
+    rec = IterationRecord(
+        run_id="it1",
+        iteration=1,
+        timestamp=utc_now_iso(),
+        prompt="p",
+        plan={"done": True},
+        actions=[{"name": "write_workspace_file"}],
+        action_results=[{"ok": True}],
+        output="ผลลัพธ์",
+        done=True,
+        token_usage={"total_tokens": 3},
+    )
+    store.append_iteration(rec)
+
+    assert store.read_iterations("it1") == [rec.to_dict()]
+
+    rec.iteration = 2
+    store.append_iteration(rec)
+    assert [row["iteration"] for row in store.iter_iterations("it1", limit=1)] == [2]
+    assert [row["iteration"] for row in store.iter_iterations("it1")] == [1, 2]
+    assert list(store.iter_iterations("missing", limit=1)) == []
+
+
 def test_state_roundtrip_enum(tmp_path: Path) -> None:
     store = FilesystemStore(tmp_path)
     state = RunState(
@@ -57,6 +92,55 @@ def test_state_roundtrip_enum(tmp_path: Path) -> None:
     assert loaded.status == RunStatus.COMPLETED
 
 
+def test_read_state_cache_tracks_external_writes(tmp_path: Path) -> None:
+    store = FilesystemStore(tmp_path)
+    state = RunState(
+        run_id="cached",
+        task="t",
+        provider="openai",
+        model="m",
+        workspace=str(tmp_path),
+        skills_dir=str(tmp_path),
+        max_iters=3,
+    )
+    store.init_run(state)
+
+    first = store.read_state("cached")
+    first.cancel_requested = True
+    assert store.read_state("cached").cancel_requested is False
+
+    other = FilesystemStore(tmp_path)
+    updated = other.read_state("cached")
+    updated.status = RunStatus.COMPLETED
+    updated.last_output = "finished elsewhere"
+    other.write_state(updated)
+
+    loaded = store.read_state("cached")
+    assert loaded.status == RunStatus.COMPLETED
+    assert loaded.last_output == "finished elsewhere"
+
+
+def test_write_state_replaces_file_without_leftovers(tmp_path: Path) -> None:
+    store = FilesystemStore(tmp_path)
+    state = RunState(
+        run_id="atomic",
+        task="t",
+        provider="openai",
+        model="m",
+        workspace=str(tmp_path),
+        skills_dir=str(tmp_path),
+        max_iters=3,
+    )
+    store.init_run(state)
+    before = (store.run_dir("atomic") / "state.json").stat().st_ino
+    state.iteration = 2
+    store.write_state(state)
+
+    assert (store.run_dir("atomic") / "state.json").stat().st_ino != before
+    assert sorted(p.name for p in store.run_dir("atomic").iterdir()) == ["artifacts", "events.log", "state.json"]
+    assert store.read_state("atomic").iteration == 2
+
+
 def test_snapshot_workspace_file(tmp_path: Path) -> None:
     workspace = tmp_path / "ws"
     workspace.mkdir(parents=True, exist_ok=True)
@@ -79,6 +163,35 @@ def test_snapshot_workspace_file(tmp_path: Path) -> None:
     rel = store.snapshot_workspace_file("r3", workspace, "sub/demo.txt")
     assert rel == "sub/demo.txt"
     assert "sub/demo.txt" in store.list_artifacts("r3")
+    copied = store.resolve_artifact_path("r3", "sub/demo.txt")
+    assert copied.read_text(encoding="utf-8") == "hello"
+    assert copied.stat().st_mtime_ns == created.stat().st_mtime_ns
+
+
+def test_list_artifact_entries_walks_nested_dirs(tmp_path: Path) -> None:
+    store = FilesystemStore(tmp_path / "runs")
+    state = RunState(
+        run_id="art",
+        task="t",
+        provider="openai",
+        model="m",
+        workspace=str(tmp_path),
+        skills_dir=str(tmp_path),
+        max_iters=1,
+    )
+    store.init_run(state)
+    artifacts_dir = store.run_dir("art") / "artifacts"
+    (artifacts_dir / "b" / "c").mkdir(parents=True)
+    (artifacts_dir / "z.txt").write_text("zz", encoding="utf-8")
+    (artifacts_dir / "b" / "c" / "deep.txt").write_text("deep", encoding="utf-8")
+    (artifacts_dir / "a.txt").write_text("a", encoding="utf-8")
+
+    expected = ["a.txt", str(Path("b") / "c" / "deep.txt"), "z.txt"]
+    assert store.list_artifacts("art") == expected
+    entries = store.list_artifact_entries("art")
+    assert [e["path"] for e in entries] == expected
+    assert [e["size"] for e in entries] == [1, 4, 2]
+    assert store.list_artifacts("missing") == []
 
 
 def test_snapshot_workspace_file_rejects_prefix_escape(tmp_path: Path) -> None:
@@ -261,6 +374,12 @@ def test_store_strategy_effectiveness_score(tmp_path: Path) -> None:
     score = store.get_strategy_effectiveness_score(key)
     assert score > 0
 
+    store.append_strategy_outcome(strategy_key="other", success=False, run_id="r4")
+    scores = store.get_strategy_effectiveness_scores()
+    assert scores[key] == score
+    assert scores["other"] < 0
+    assert store.get_strategy_effectiveness_score("unknown") == 0.0
+
 
 def test_retrieve_success_experiences_filters_by_intent_and_quality(tmp_path: Path) -> None:
     store = FilesystemStore(tmp_path / "runs")
@@ -364,3 +483,28 @@ def test_retrieve_failure_experiences_prefers_matching_intent(tmp_path: Path) ->
     store.append_strategy_outcome(strategy_key=bad_key, success=False, run_id="r5")
     bad_score = store.get_strategy_effectiveness_score(bad_key)
     assert bad_score < 0
+
+
+def test_append_handles_survive_trim_and_replace(tmp_path: Path) -> None:
+    store = FilesystemStore(tmp_path / "runs")
+    for idx in range(12):
+        store.append_success_experience({"run_id": f"r{idx}", "status": "completed"}, max_items=10)
+    rows = store.read_success_experiences(limit=0)
+    assert [row["run_id"] for row in rows] == [f"r{idx}" for idx in range(2, 12)]
+
+    replacement = store.experience_file.with_suffix(".tmp")
+    replacement.write_text("", encoding="utf-8")
+    replacement.replace(store.experience_file)
+    store.append_success_experience({"run_id": "after", "status": "completed"})
+    assert [row["run_id"] for row in store.read_success_experiences(limit=0)] == ["after"]
+
+    store.close()
+    store.append_success_experience({"run_id": "reopened", "status": "completed"})
+    assert [row["run_id"] for row in store.read_success_experiences(limit=0)] == ["after", "reopened"]
+
+
+def test_store_context_manager_closes_append_handles(tmp_path: Path) -> None:
+    with FilesystemStore(tmp_path / "runs") as store:
+        store.append_success_experience({"run_id": "r1", "status": "completed"})
+        assert store.experience_file in store._append_handles
+    assert len(store._append_handles) == 0
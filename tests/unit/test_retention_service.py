@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import inspect
 import json
+import os
+import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from softnix_agentic_agent.storage.retention_service import RetentionConfig, RunRetentionService
+import pytest
+
+from softnix_agentic_agent.storage.retention_service import RetentionConfig, RunRetentionService, _dir_size_bytes
 
 
 def _write_run(
@@ -55,6 +60,7 @@ def test_retention_report_keeps_running_and_marks_old_finished(tmp_path: Path) -
     assert planned_ids == ["old-done"]
     assert report["summary"]["active_runs"] == 1
     assert report["summary"]["planned_delete_runs"] == 1
+    assert all(not key.startswith("_") for row in report["items"] for key in row)
 
 
 def test_retention_cleanup_applies_count_and_byte_caps(tmp_path: Path) -> None:
@@ -170,3 +176,209 @@ def test_retention_cleanup_skill_builds_and_experience(tmp_path: Path) -> None:
     assert len([x for x in success_lines if x.strip()]) == 3
     assert len([x for x in failure_lines if x.strip()]) == 2
     assert len([x for x in strategy_lines if x.strip()]) == 4
+
+
+def test_dir_size_bytes_counts_nested_files_without_following_symlinks(tmp_path: Path) -> None:
+    root = tmp_path / "run"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "top.txt").write_text("12345", encoding="utf-8")
+    (root / "a" / "b" / "deep.txt").write_text("123", encoding="utf-8")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "big.txt").write_text("x" * 100, encoding="utf-8")
+    (root / "link").symlink_to(outside, target_is_directory=True)
+
+    assert _dir_size_bytes(root) == 8
+    assert _dir_size_bytes(tmp_path / "missing") == 0
+
+
+def test_dir_size_bytes_path_walk_matches_fd_walk(tmp_path: Path, monkeypatch) -> None:
+    from softnix_agentic_agent.storage import retention_service
+
+    root = tmp_path / "run"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "one.txt").write_text("1", encoding="utf-8")
+    (root / "a" / "b" / "two.txt").write_text("22", encoding="utf-8")
+    fd_total = _dir_size_bytes(root)
+    monkeypatch.setattr(retention_service, "_SCANDIR_SUPPORTS_FD", False)
+    assert _dir_size_bytes(root) == fd_total == 3
+
+
+def test_dir_size_bytes_walks_trees_deeper_than_the_recursion_limit(tmp_path: Path, monkeypatch) -> None:
+    from softnix_agentic_agent.storage import retention_service
+
+    root = tmp_path / "run"
+    deepest = root.joinpath(*["d"] * 200)
+    deepest.mkdir(parents=True)
+    (root / "top.txt").write_text("12", encoding="utf-8")
+    (deepest / "leaf.txt").write_text("123", encoding="utf-8")
+
+    # Leave far fewer frames than the tree has levels.
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack(0)) + 50)
+    try:
+        fd_total = _dir_size_bytes(root)
+        monkeypatch.setattr(retention_service, "_SCANDIR_SUPPORTS_FD", False)
+        path_total = _dir_size_bytes(root)
+    finally:
+        sys.setrecursionlimit(old_limit)
+    assert fd_total == path_total == 5
+
+
+def test_retention_report_reuses_finished_sizes_and_remeasures_active(tmp_path: Path) -> None:
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(runs_dir, "done", status="completed", updated_at=now - timedelta(days=1), artifact_text="abc")
+    _write_run(runs_dir, "live", status="running", updated_at=now, artifact_text="abc")
+
+    service = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(enabled=True))
+
+    def sizes() -> dict[str, int]:
+        return {row["run_id"]: row["size_bytes"] for row in service.report(now=now)["items"]}
+
+    first = sizes()
+    assert first["done"] > 0
+
+    # Neither state.json changes; only the running run is measured again.
+    (runs_dir / "done" / "artifacts" / "extra.txt").write_text("x" * 50, encoding="utf-8")
+    (runs_dir / "live" / "artifacts" / "extra.txt").write_text("x" * 50, encoding="utf-8")
+    second = sizes()
+    assert second["done"] == first["done"]
+    assert second["live"] == first["live"] + 50
+
+    state_path = runs_dir / "done" / "state.json"
+    mtime_ns = state_path.stat().st_mtime_ns + 1_000_000_000
+    _write_run(runs_dir, "done", status="completed", updated_at=now, artifact_text="abc")
+    os.utime(state_path, ns=(mtime_ns, mtime_ns))
+    assert sizes()["done"] > first["done"]
+
+
+def test_retention_parallel_size_scan_matches_serial(tmp_path: Path) -> None:
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    for idx in range(6):
+        _write_run(runs_dir, f"r{idx}", status="completed", updated_at=now, artifact_text="x" * (idx + 1))
+
+    serial = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(size_scan_workers=1)).report(now=now)
+    parallel = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(size_scan_workers=4)).report(now=now)
+
+    assert [row["size_bytes"] for row in parallel["items"]] == [row["size_bytes"] for row in serial["items"]]
+    assert parallel["summary"]["total_bytes"] == serial["summary"]["total_bytes"]
+
+
+def test_retention_report_sizes_only_selected_runs_without_bytes_cap(tmp_path: Path) -> None:
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(runs_dir, "old", status="completed", updated_at=now - timedelta(days=30), artifact_text="abc")
+    _write_run(runs_dir, "new", status="completed", updated_at=now)
+
+    service = RunRetentionService(
+        runs_dir=runs_dir,
+        config=RetentionConfig(enabled=True, keep_finished_days=14, max_bytes=0),
+    )
+    report = service.report(now=now)
+
+    sizes = {row["run_id"]: row["size_bytes"] for row in report["items"]}
+    assert sizes["old"] > 0
+    assert sizes["new"] is None
+    assert report["summary"]["sizes_complete"] is False
+    assert report["summary"]["planned_reclaim_bytes"] == sizes["old"]
+    assert report["summary"]["total_bytes"] == sizes["old"]
+
+
+def test_rm_rf_removes_all_targets_in_one_batch(tmp_path: Path) -> None:
+    from softnix_agentic_agent.storage import retention_service
+
+    if retention_service._RM_BIN is None:
+        pytest.skip("no rm binary on this platform")
+    targets = [tmp_path / "a", tmp_path / "b"]
+    for target in targets:
+        (target / "nested").mkdir(parents=True)
+        (target / "nested" / "f.txt").write_text("x", encoding="utf-8")
+    retention_service._rm_rf(targets)
+    assert not any(target.exists() for target in targets)
+
+
+def test_retention_cleanup_falls_back_without_rm(tmp_path: Path, monkeypatch) -> None:
+    from softnix_agentic_agent.storage import retention_service
+
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(runs_dir, "old", status="completed", updated_at=now - timedelta(days=30))
+    _write_run(runs_dir, "new", status="completed", updated_at=now)
+    monkeypatch.setattr(retention_service, "_RM_BIN", None)
+
+    service = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(enabled=True, keep_finished_days=14))
+    result = service.run_cleanup(dry_run=False, now=now)
+
+    assert result["deleted_run_ids"] == ["old"]
+    assert result["errors"] == []
+    assert not (runs_dir / "old").exists()
+    assert (runs_dir / "new").exists()
+
+
+def test_retention_dry_run_is_not_blocked_by_inflight_cleanup(tmp_path: Path) -> None:
+    from softnix_agentic_agent.storage import retention_service
+
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(runs_dir, "old", status="completed", updated_at=now - timedelta(days=30))
+    service = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(enabled=True, keep_finished_days=14))
+
+    service._inflight.add(retention_service._CLEANUP_INFLIGHT)
+    assert service.run_cleanup(dry_run=False, now=now)["status"] == "busy"
+    assert service.run_cleanup(dry_run=True, now=now)["status"] == "ok"
+    assert (runs_dir / "old").exists()
+
+    service._inflight.clear()
+    assert service.run_cleanup(dry_run=False, now=now)["deleted_run_ids"] == ["old"]
+    assert service._inflight == set()
+
+
+def test_trim_jsonl_file_streams_and_keeps_tail(tmp_path: Path) -> None:
+    service = RunRetentionService(runs_dir=tmp_path / "runs", config=RetentionConfig())
+    path = tmp_path / "experience" / "success_cases.jsonl"
+    path.write_text('{"i":1}\n\n{"i":2}\n{"i":3}\n   \n{"i":4}', encoding="utf-8")
+
+    assert service._trim_jsonl_file(path, max_items=2) == 2
+    assert path.read_text(encoding="utf-8") == '{"i":3}\n{"i":4}\n'
+    assert service._trim_jsonl_file(path, max_items=2) == 0
+    assert sorted(p.name for p in path.parent.iterdir()) == ["success_cases.jsonl"]
+
+
+def test_retention_report_skips_scan_when_disabled(tmp_path: Path) -> None:
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(runs_dir, "old", status="completed", updated_at=now - timedelta(days=30))
+    service = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(enabled=False, keep_finished_days=14))
+
+    report = service.report()
+    assert report["scanned"] is False
+    assert report["summary"]["total_runs"] == 1
+    assert report["items"] == []
+    assert report["policy"]["enabled"] is False
+
+    # Each call gets its own payload, even while the counts are cached.
+    report["summary"]["total_runs"] = 99
+    report["items"].append({"run_id": "x"})
+    again = service.report()
+    assert again["summary"]["total_runs"] == 1
+    assert again["items"] == []
+
+    # Explicit cleanup still evaluates the full policy.
+    result = service.run_cleanup(dry_run=True, now=now)
+    assert result["report"]["scanned"] is True
+    assert result["report"]["planned_deletion_ids"] == ["old"]
+
+
+def test_retention_disabled_report_counts_runs_like_the_scanned_report(tmp_path: Path) -> None:
+    runs_dir = tmp_path / "runs"
+    now = datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    _write_run(tmp_path / "elsewhere", "linked", status="completed", updated_at=now)
+    _write_run(runs_dir, "local", status="completed", updated_at=now)
+    (runs_dir / "linked").symlink_to(tmp_path / "elsewhere" / "linked", target_is_directory=True)
+
+    service = RunRetentionService(runs_dir=runs_dir, config=RetentionConfig(enabled=False))
+    disabled_total = service.report()["summary"]["total_runs"]
+    scanned_total = service.run_cleanup(dry_run=True, now=now)["report"]["summary"]["total_runs"]
+    assert disabled_total == scanned_total == 2
@@ -1,6 +1,10 @@
+import json
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 from softnix_agentic_agent.storage.schedule_store import CronSpec, ScheduleStore, compute_next_run_at
 
 
@@ -20,6 +24,30 @@ def test_cron_spec_next_after() -> None:
     assert next_run == datetime(2026, 2, 10, 2, 0, tzinfo=timezone.utc)
 
 
+def test_cron_spec_parse_reuses_immutable_spec() -> None:
+    spec = CronSpec.parse("*/15 9-17 * * 1-5")
+    assert CronSpec.parse("*/15 9-17 * * 1-5") is spec
+    assert spec.minute == frozenset({0, 15, 30, 45})
+    with pytest.raises(AttributeError):
+        spec.minute = frozenset({0})  # type: ignore[misc]
+
+
+def test_cron_spec_next_after_jumps_to_sparse_fields() -> None:
+    now = datetime(2026, 2, 10, 1, 10, tzinfo=timezone.utc)
+    assert CronSpec.parse("0 0 1 1 *").next_after(now, "UTC") == datetime(2027, 1, 1, 0, 0, tzinfo=timezone.utc)
+    assert CronSpec.parse("59 23 31 * *").next_after(now, "UTC") == datetime(
+        2026, 3, 31, 23, 59, tzinfo=timezone.utc
+    )
+    # Day-of-month and day-of-week are OR-ed when both are restricted: the 13th or a Friday.
+    assert CronSpec.parse("0 12 13 * 5").next_after(now, "UTC") == datetime(2026, 2, 13, 12, 0, tzinfo=timezone.utc)
+    assert CronSpec.parse("0 12 20 * 1").next_after(now, "UTC") == datetime(2026, 2, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def test_cron_spec_next_after_rejects_unreachable_expression() -> None:
+    with pytest.raises(ValueError):
+        CronSpec.parse("0 0 30 2 *").next_after(datetime(2026, 2, 10, tzinfo=timezone.utc), "UTC")
+
+
 def test_schedule_store_create_list_and_mark_dispatched(tmp_path: Path) -> None:
     store = ScheduleStore(tmp_path / "schedules")
     item = store.create_schedule(
@@ -42,3 +70,114 @@ def test_schedule_store_create_list_and_mark_dispatched(tmp_path: Path) -> None:
     updated = store.mark_dispatched(item["id"], datetime(2026, 2, 10, 2, 0, tzinfo=timezone.utc))
     assert updated["last_dispatched_at"] == "2026-02-10T02:00:00+00:00"
     assert updated["next_run_at"] == "2026-02-11T02:00:00+00:00"
+
+
+def test_schedule_store_list_tracks_external_file_changes(tmp_path: Path) -> None:
+    store = ScheduleStore(tmp_path / "schedules")
+    item = store.create_schedule(
+        {
+            "task": "daily summary",
+            "schedule_type": "cron",
+            "timezone": "Asia/Bangkok",
+            "cron_expr": "0 9 * * *",
+            "next_run_at": "2026-02-10T02:00:00+00:00",
+        }
+    )
+    listed = store.list_schedules()
+    assert listed[0]["task"] == "daily summary"
+    listed[0]["task"] = "mutated by caller"
+    assert store.get_schedule(item["id"])["task"] == "daily summary"
+
+    path = tmp_path / "schedules" / f"{item['id']}.json"
+    path.write_text(json.dumps({**item, "task": "edited on disk"}), encoding="utf-8")
+    assert store.list_schedules()[0]["task"] == "edited on disk"
+
+    path.unlink()
+    assert store.list_schedules() == []
+    with pytest.raises(FileNotFoundError):
+        store.get_schedule(item["id"])
+
+
+def test_schedule_store_rereads_same_size_replacement_within_one_tick(tmp_path: Path) -> None:
+    store = ScheduleStore(tmp_path / "schedules")
+    item = store.create_schedule(
+        {"task": "t", "schedule_type": "one_time", "timezone": "UTC", "next_run_at": "2026-02-10T02:00:00+00:00"}
+    )
+    path = tmp_path / "schedules" / f"{item['id']}.json"
+    st = path.stat()
+
+    replacement = path.with_name("replacement.tmp")
+    replacement.write_bytes(path.read_bytes().replace(b"2026-02-10T02", b"2026-02-11T02"))
+    replacement.replace(path)
+    # Same size and mtime as before; only the inode tells the documents apart.
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert path.stat().st_size == st.st_size
+
+    assert store.get_schedule(item["id"])["next_run_at"] == "2026-02-11T02:00:00+00:00"
+
+
+def test_read_schedule_runs_returns_newest_first_from_tail(tmp_path: Path) -> None:
+    from softnix_agentic_agent.storage import schedule_store
+
+    store = ScheduleStore(tmp_path / "schedules")
+    run_ids = [f"run-{idx:03d}" for idx in range(40)]
+    for run_id in run_ids:
+        store.append_schedule_run("sched", run_id)
+    with (tmp_path / "schedules" / "sched.runs.jsonl").open("a", encoding="utf-8") as f:
+        f.write("not-json\n\n")
+
+    assert [row["run_id"] for row in store.read_schedule_runs("sched", limit=5)] == run_ids[::-1][:5]
+    assert [row["run_id"] for row in store.read_schedule_runs("sched", limit=100)] == run_ids[::-1]
+    assert store.read_schedule_runs("missing") == []
+
+    runs_path = tmp_path / "schedules" / "sched.runs.jsonl"
+    expected = runs_path.read_bytes().split(b"\n")[::-1]
+    assert list(schedule_store._iter_lines_reversed(runs_path, block_size=7)) == expected
+
+
+def test_list_due_schedules_returns_earliest_due_first(tmp_path: Path) -> None:
+    store = ScheduleStore(tmp_path / "schedules")
+
+    def _create(task: str, next_run_at: str | None, enabled: bool = True) -> dict:
+        return store.create_schedule(
+            {
+                "task": task,
+                "schedule_type": "one_time",
+                "timezone": "UTC",
+                "run_at": next_run_at,
+                "next_run_at": next_run_at,
+                "enabled": enabled,
+            }
+        )
+
+    late = _create("late", "2026-02-10T03:00:00+00:00")
+    early = _create("early", "2026-02-10T09:00:00+07:00")
+    _create("future", "2026-02-11T00:00:00Z")
+    _create("disabled", "2026-02-09T00:00:00+00:00", enabled=False)
+    _create("unscheduled", None)
+    now = datetime(2026, 2, 10, 4, 0, tzinfo=timezone.utc)
+
+    assert [item["task"] for item in store.list_due_schedules(now)] == ["early", "late"]
+    assert [item["task"] for item in store.list_due_schedules(now, limit=1)] == ["early"]
+
+    store.mark_dispatched(early["id"], now)
+    assert [item["id"] for item in store.list_due_schedules(now)] == [late["id"]]
+
+    path = tmp_path / "schedules" / f"{late['id']}.json"
+    path.write_text(json.dumps({**late, "next_run_at": "2026-02-12T00:00:00+00:00"}), encoding="utf-8")
+    assert store.list_due_schedules(now) == []
+
+
+def test_schedule_store_updates_on_other_ids_do_not_wait(tmp_path: Path) -> None:
+    store = ScheduleStore(tmp_path / "schedules")
+    payload = {"task": "t", "schedule_type": "one_time", "timezone": "UTC", "run_at": None}
+    first = store.create_schedule(payload)
+    second = store.create_schedule(payload)
+
+    with store._locks.hold(first["id"]):
+        # Would deadlock under a single store-wide lock.
+        updated = store.update_schedule(second["id"], {"task": "changed"})
+    assert updated["task"] == "changed"
+    store.delete_schedule(first["id"])
+    # Locks live only while held, so written and deleted ids leave nothing behind.
+    assert len(store._locks) == 0
@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+import shutil
+
+from softnix_agentic_agent.storage.skill_build_store import SkillBuildStore
+
+
+def test_skill_build_store_list_jobs_returns_newest_within_limit(tmp_path: Path) -> None:
+    store = SkillBuildStore(tmp_path / "skill-builds")
+    jobs = [store.create_job({"task": f"t{idx}", "skill_name": f"s{idx}"}) for idx in range(4)]
+    for idx, job in enumerate(jobs):
+        mtime_ns = 1_700_000_000_000_000_000 + idx * 1_000_000_000
+        os.utime(store.state_path(job["id"]), ns=(mtime_ns, mtime_ns))
+    (tmp_path / "skill-builds" / "no-state").mkdir()
+
+    assert [row["id"] for row in store.list_jobs(limit=2)] == [jobs[3]["id"], jobs[2]["id"]]
+    assert len(store.list_jobs(limit=100)) == 4
+
+
+def test_skill_build_store_update_job_replaces_state_atomically(tmp_path: Path) -> None:
+    store = SkillBuildStore(tmp_path / "skill-builds")
+    job = store.create_job({"task": "t", "skill_name": "s"})
+    updated = store.update_job(job["id"], {"status": "completed"})
+
+    assert store.get_job(job["id"]) == updated
+    assert updated["completed_at"] == updated["updated_at"]
+    assert sorted(p.name for p in store.build_dir(job["id"]).iterdir()) == ["events.log", "state.json"]
+
+
+def test_skill_build_store_append_event_reuses_handle_until_job_finishes(tmp_path: Path) -> None:
+    store = SkillBuildStore(tmp_path / "skill-builds")
+    job = store.create_job({"task": "t", "skill_name": "s"})
+    store.append_event(job["id"], "stage=plan")
+    store.append_event(job["id"], "stage=build")
+    assert [line.split(" ", 1)[1] for line in store.read_events(job["id"])] == ["stage=plan", "stage=build"]
+    assert store.events_path(job["id"]) in store._event_handles
+
+    store.update_job(job["id"], {"status": "failed"})
+    assert store.events_path(job["id"]) not in store._event_handles
+    store.append_event(job["id"], "done")
+    assert store.read_events(job["id"])[-1].endswith(" done")
+    store.close()
+    assert len(store._event_handles) == 0
+
+
+def test_skill_build_store_lists_nothing_after_builds_dir_is_removed(tmp_path: Path) -> None:
+    store = SkillBuildStore(tmp_path / "skill-builds")
+    store.create_job({"task": "t", "skill_name": "s"})
+    store.close()
+    shutil.rmtree(store.builds_dir)
+
+    assert store.list_jobs() == []
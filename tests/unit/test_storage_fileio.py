@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from softnix_agentic_agent.storage import fileio
+from softnix_agentic_agent.storage.fileio import AppendHandleCache, atomic_write_bytes, atomic_write_json
+
+
+def test_atomic_write_json_replaces_file_compactly(tmp_path: Path) -> None:
+    path = tmp_path / "item.json"
+    path.write_text("old", encoding="utf-8")
+    atomic_write_json(path, {"task": "สรุป", "n": 1})
+
+    assert path.read_text(encoding="utf-8") == '{"task":"สรุป","n":1}'
+    assert json.loads(path.read_bytes()) == {"task": "สรุป", "n": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["item.json"]
+
+
+def test_atomic_write_bytes_keeps_original_when_replace_fails(tmp_path: Path, monkeypatch) -> None:
+    path = tmp_path / "state.json"
+    path.write_bytes(b"original")
+
+    def fail_replace(src, dst):  # type: ignore[no-untyped-def]
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(fileio.os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        atomic_write_bytes(path, b"new")
+
+    assert path.read_bytes() == b"original"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_append_handle_cache_evicts_oldest_and_reopens_replaced_files(tmp_path: Path) -> None:
+    cache = AppendHandleCache(max_handles=2)
+    paths = [tmp_path / f"{idx}.log" for idx in range(3)]
+    for path in paths:
+        cache.append(path, b"a\n")
+    assert len(cache) == 2
+    assert paths[0] not in cache
+
+    replacement = tmp_path / "new.log"
+    replacement.write_bytes(b"")
+    replacement.replace(paths[2])
+    cache.append(paths[2], b"b\n")
+    assert paths[2].read_bytes() == b"b\n"
+
+    cache.discard(paths[2])
+    assert paths[2] not in cache
+    cache.close()
+    assert len(cache) == 0
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from softnix_agentic_agent.storage.locks import KeyedLocks
+
+
+def test_keyed_locks_serialize_one_key_and_drop_it_when_released() -> None:
+    locks = KeyedLocks()
+    order: list[str] = []
+    waiting = threading.Event()
+    acquired = threading.Event()
+
+    def second_writer() -> None:
+        waiting.set()
+        with locks.hold("a"):
+            order.append("second")
+            acquired.set()
+
+    with locks.hold("a"):
+        worker = threading.Thread(target=second_writer)
+        worker.start()
+        assert waiting.wait(timeout=5)
+        # Block until the worker is registered on "a", so it is really queued behind this holder.
+        deadline = time.monotonic() + 5
+        while locks._entries["a"][1] < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0)
+        assert not acquired.is_set()
+        with locks.hold("b"):
+            order.append("other key")
+        order.append("first")
+    assert acquired.wait(timeout=5)
+    worker.join(timeout=5)
+
+    assert order == ["other key", "first", "second"]
+    assert len(locks) == 0
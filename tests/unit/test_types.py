@@ -0,0 +1,14 @@
+from softnix_agentic_agent import types as types_module
+
+
+def test_cached_timestamps_keep_one_slot_per_granularity(monkeypatch) -> None:
+    stamps = iter(f"t{idx}" for idx in range(10))
+    monkeypatch.setattr(types_module, "_cached_now_iso", {})
+    monkeypatch.setattr(types_module, "utc_now_iso", lambda: next(stamps))
+    monkeypatch.setattr(types_module.time, "monotonic_ns", lambda: 1_234_567_890_123)
+
+    coarse = types_module.utc_now_iso_cached()
+    fine = types_module.utc_now_iso_cached(granularity_ms=1)
+    # Interleaved callers with different granularities no longer evict each other.
+    assert types_module.utc_now_iso_cached() == coarse == "t0"
+    assert types_module.utc_now_iso_cached(granularity_ms=1) == fine == "t1"
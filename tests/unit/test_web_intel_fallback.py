@@ -22,3 +22,11 @@ def test_decide_web_fallback_missing_required_keywords() -> None:
     )
     assert decision.sufficient is False
     assert "required_keywords_missing" in decision.reasons
+
+
+def test_decide_web_fallback_matches_overlapping_keywords() -> None:
+    keywords = ["Softnix", "soft", "nix", "logger", "log", "Agentic", "a+b"]
+    text = "the softnix logger page covers a+b"
+    decision = decide_web_fallback(text, min_chars=10, required_keywords=keywords)
+    assert decision.matched_keywords == [kw for kw in keywords if kw.lower() in text.lower()]
+    assert decision.matched_keywords == ["Softnix", "soft", "nix", "logger", "log", "a+b"]